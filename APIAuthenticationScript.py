@@ -1,6 +1,6 @@
-import requests
-from dotenv import set_key, load_dotenv
+from dotenv import load_dotenv
 import os
+from veracore_client import VeraCoreClient, TokenManager, DEFAULT_TOKEN_CACHE_PATH
 
 dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(dotenv_path)
@@ -9,7 +9,8 @@ USERNAME = os.getenv("USERNAME")
 PASSWORD = os.getenv("PASSWORD")
 SYSTEM_ID = os.getenv("SYSTEM_ID")
 
-LOGIN_URL = "https://wms.3plwinner.com/VeraCore/Public.Api/api/Login"
+# The same cache reports.py uses
+TOKEN_CACHE_PATH = DEFAULT_TOKEN_CACHE_PATH
 
 print("Debug info:")
 print(f"USERNAME: '{USERNAME}'")
@@ -18,27 +19,15 @@ print(f"SYSTEM_ID: '{SYSTEM_ID}'")
 print(f".env file path: {dotenv_path}")
 print(f".env file exists: {os.path.exists(dotenv_path)}")
 
-payload = {
-    "userName": "VSO335",
-    "password": PASSWORD,
-    "systemId": SYSTEM_ID
-}
+client = VeraCoreClient(pool_size=1)
+token_manager = TokenManager(client, USERNAME, PASSWORD, SYSTEM_ID, cache_path=TOKEN_CACHE_PATH)
 
-response = requests.post(LOGIN_URL, json=payload)
-
-if response.status_code == 200:
-    json_response = response.json()
-    token = json_response.get("Token")
+try:
+    token_manager.login()
     print("Login successful!")
-    print("Token", token)
-
-    if token:
-        set_key(dotenv_path, "W_TOKEN", token)
-        print("Token saved to .env file as W_TOKEN.")
-else:
+    print(f"Token cached in {TOKEN_CACHE_PATH} until {token_manager.expires_at.isoformat(timespec='seconds')}")
+except Exception as e:
     print("Login failed.")
-    print("Status Code:", response.status_code)
-    print("Response JSON:", response.text)
-
-
-
+    print(e)
+finally:
+    client.close()
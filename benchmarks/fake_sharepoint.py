@@ -0,0 +1,63 @@
+import os
+import time
+import shutil
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFolderUploader:
+    """Stand-in for SharePointUploader that writes into a local folder.
+
+    Implements the calls reports.py makes (upload, list_files, ensure_folders, move_files,
+    reset_stats, log_summary). Server-relative URLs under folder_url map to paths under root.
+    upload_delay adds a fixed per-file latency to mimic the round-trip to SharePoint.
+    """
+
+    def __init__(self, root, folder_url="/sites/benchmark/Shared Documents/InventoryHealthDashboard", upload_delay=0.0):
+        self.root = root
+        self.folder_url = folder_url
+        self.upload_delay = upload_delay
+        self.upload_stats = []
+        self._lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, server_relative_url):
+        relative = server_relative_url[len(self.folder_url):].strip("/")
+        return os.path.join(self.root, *relative.split("/")) if relative else self.root
+
+    def upload(self, local_file_path, sharepoint_filename, folder_url=None):
+        with self._lock:
+            start = time.perf_counter()
+            time.sleep(self.upload_delay)
+            shutil.copyfile(local_file_path, os.path.join(self._path(folder_url or self.folder_url), sharepoint_filename))
+            size = os.path.getsize(local_file_path)
+            self.upload_stats.append({"file": sharepoint_filename, "bytes": size, "seconds": time.perf_counter() - start, "success": True})
+            return True
+
+    def list_files(self, fields):
+        return [{"Name": name, "ServerRelativeUrl": f"{self.folder_url}/{name}"}
+                for name in sorted(os.listdir(self.root)) if os.path.isfile(os.path.join(self.root, name))]
+
+    def ensure_folders(self, folder_urls):
+        for folder_url in folder_urls:
+            os.makedirs(self._path(folder_url), exist_ok=True)
+        return []
+
+    def move_files(self, moves):
+        failed = []
+        for source_url, destination_url in moves:
+            try:
+                os.replace(self._path(source_url), self._path(destination_url))
+            except OSError:
+                failed.append((source_url, destination_url))
+        return failed
+
+    def reset_stats(self):
+        with self._lock:
+            self.upload_stats = []
+
+    def log_summary(self):
+        total_bytes = sum(stat["bytes"] for stat in self.upload_stats)
+        logger.info(f"Local upload stand-in: {len(self.upload_stats)} files, {total_bytes} bytes written to {self.root}")
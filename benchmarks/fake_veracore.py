@@ -0,0 +1,289 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(REPO_ROOT, "reports_manifest.json")
+SAMPLE_FOLDER = os.path.join(REPO_ROOT, "output_20251124_101245")
+DATE_FORMAT = "%m/%d/%Y %H:%M:%S"
+TOKEN = "fake-veracore-token"
+
+# Used for manifest reports with no sample CSV to copy the shape from
+FALLBACK_COLUMNS = ["Order ID", "Product ID", "Quantity", "Date Entered"]
+FALLBACK_ROWS = 100
+
+
+class SyntheticReport:
+    """Rows shaped like a real report: the sample CSV's rows repeated `scale` times.
+
+    Copies after the first get a -<n> suffix on their ID columns, so natural keys stay unique and
+    deduplication does not shrink the data; dates are kept, so date filters select realistic ranges.
+    """
+
+    def __init__(self, name, columns, sample_rows, scale=1.0):
+        self.name = name
+        self.columns = columns
+        self.sample_rows = sample_rows
+        self.row_count = int(len(sample_rows) * scale)
+        self.id_columns = [i for i, column in enumerate(columns) if i == 0 or "ID" in column.split()]
+        self._dates = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_sample(cls, name, sample_path, scale=1.0):
+        if sample_path and os.path.exists(sample_path):
+            with open(sample_path, newline="", encoding="utf-8") as sample_file:
+                reader = csv.reader(sample_file)
+                columns = next(reader)
+                rows = [row for row in reader if len(row) == len(columns)]
+        else:
+            columns = FALLBACK_COLUMNS
+            rows = [[f"ORD{i}", f"P{i % 37}", str(i % 11), f"01/{i % 28 + 1:02d}/2025 08:00:00"] for i in range(FALLBACK_ROWS)]
+        return cls(name, columns, rows, scale)
+
+    def _parsed_dates(self, column):
+        """Sample row dates for a filtered column, parsed once"""
+        with self._lock:
+            if column not in self._dates:
+                index = self.columns.index(column)
+                dates = []
+                for row in self.sample_rows:
+                    try:
+                        dates.append(datetime.strptime(row[index], DATE_FORMAT))
+                    except ValueError:
+                        dates.append(None)
+                self._dates[column] = dates
+            return self._dates[column]
+
+    def sample_indexes(self, filters):
+        """Indexes of the sample rows that pass the date filters (GreaterThanOrEqual / LessThan)"""
+        indexes = range(len(self.sample_rows))
+        for report_filter in filters or []:
+            column = report_filter.get("reportFieldTitle")
+            if column not in self.columns:
+                continue
+            value = datetime.strptime(report_filter["value"], DATE_FORMAT)
+            dates = self._parsed_dates(column)
+            if report_filter.get("operator") == "GreaterThanOrEqual":
+                indexes = [i for i in indexes if dates[i] is not None and dates[i] >= value]
+            elif report_filter.get("operator") == "LessThan":
+                indexes = [i for i in indexes if dates[i] is not None and dates[i] < value]
+        return list(indexes)
+
+    def count(self, filters):
+        selected = set(self.sample_indexes(filters))
+        if not self.sample_rows:
+            return 0
+        full_cycles, remainder = divmod(self.row_count, len(self.sample_rows))
+        return full_cycles * len(selected) + sum(1 for i in range(remainder) if i in selected)
+
+    def iter_rows(self, filters):
+        selected = set(self.sample_indexes(filters))
+        for n in range(self.row_count):
+            cycle, index = divmod(n, len(self.sample_rows))
+            if index not in selected:
+                continue
+            row = self.sample_rows[index]
+            if cycle:
+                row = list(row)
+                for column in self.id_columns:
+                    row[column] = f"{row[column]}-{cycle}"
+            yield dict(zip(self.columns, row))
+
+
+class FakeVeraCore:
+    """In-memory VeraCore Public API: login, report catalog, report tasks, status and data.
+
+    A task reports "Processing" until processing_seconds (plus processing_seconds_per_1k_rows) have
+    passed, then "Done"; tasks over too_large_rows answer "Request too Large". Report data is
+    generated while it is sent, so large scales do not have to fit in the server's memory.
+    """
+
+    def __init__(self, manifest_path=MANIFEST_PATH, sample_folder=SAMPLE_FOLDER, scale=1.0, processing_seconds=1.0,
+                 processing_seconds_per_1k_rows=0.0, too_large_rows=None, host="127.0.0.1", port=0):
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        self.reports = {}
+        for report in manifest["reports"]:
+            sample_path = os.path.join(sample_folder, report["output_csv"])
+            self.reports[report["report_name"]] = SyntheticReport.from_sample(report["report_name"], sample_path, scale)
+        self.processing_seconds = processing_seconds
+        self.processing_seconds_per_1k_rows = processing_seconds_per_1k_rows
+        self.too_large_rows = too_large_rows
+        self.tasks = {}
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._next_task = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count_request(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def start_task(self, report_name, filters):
+        report = self.reports[report_name]
+        rows = report.count(filters)
+        with self._lock:
+            self._next_task += 1
+            task_id = f"task-{self._next_task}"
+            self.tasks[task_id] = {
+                "report": report,
+                "filters": filters,
+                "rows": rows,
+                "ready_at": time.monotonic() + self.processing_seconds + rows / 1000 * self.processing_seconds_per_1k_rows,
+            }
+        return task_id
+
+    def task_status(self, task_id):
+        task = self.tasks[task_id]
+        if self.too_large_rows and task["rows"] > self.too_large_rows:
+            return "Request too Large"
+        return "Done" if time.monotonic() >= task["ready_at"] else "Processing"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, body, status=200):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def authorized(self):
+                if self.headers.get("Authorization", "").lower() == f"bearer {TOKEN}":
+                    return True
+                self.send_json({"Message": "Authorization has been denied for this request."}, 401)
+                return False
+
+            def path_parts(self):
+                return [part for part in urlparse(self.path).path.split("/") if part][1:]
+
+            def do_POST(self):
+                parts = self.path_parts()
+                body = self.read_body()
+                if parts == ["Login"]:
+                    fake.count_request("login")
+                    form = parse_qs(body.decode("utf-8"))
+                    if not form.get("userName") or not form.get("password"):
+                        return self.send_json({"Message": "Invalid credentials"}, 400)
+                    return self.send_json({"Token": TOKEN, "ExpiresIn": 3600})
+                if parts == ["reports"]:
+                    fake.count_request("start")
+                    if not self.authorized():
+                        return
+                    request = json.loads(body or b"{}")
+                    if request.get("reportName") not in fake.reports:
+                        return self.send_json({"Message": f"Report {request.get('reportName')} not found"}, 400)
+                    return self.send_json({"TaskId": fake.start_task(request["reportName"], request.get("filters"))})
+                self.send_json({"Message": "Not found"}, 404)
+
+            def do_GET(self):
+                parts = self.path_parts()
+                if not self.authorized():
+                    return
+                if parts == ["reports"]:
+                    fake.count_request("catalog")
+                    return self.send_json([{"ReportName": name} for name in fake.reports])
+                if len(parts) == 3 and parts[0] == "reports" and parts[2] == "status":
+                    fake.count_request("status")
+                    if parts[1] not in fake.tasks:
+                        return self.send_json({"Message": "Task not found"}, 404)
+                    return self.send_json({"Status": fake.task_status(parts[1])})
+                if len(parts) == 2 and parts[0] == "reports":
+                    fake.count_request("data")
+                    task = fake.tasks.get(parts[1])
+                    if task is None or fake.task_status(parts[1]) != "Done":
+                        return self.send_json({"Message": "Report is not ready"}, 404)
+                    return self.send_rows(task)
+                self.send_json({"Message": "Not found"}, 404)
+
+            def send_rows(self, task):
+                """Stream {"Data": [...]} with chunked transfer encoding, one batch of rows per chunk"""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.write_chunk(b'{"Data":[')
+                batch = []
+                first = True
+                for row in task["report"].iter_rows(task["filters"]):
+                    batch.append(json.dumps(row))
+                    if len(batch) == 1000:
+                        self.write_chunk((("" if first else ",") + ",".join(batch)).encode("utf-8"))
+                        first = False
+                        batch = []
+                if batch:
+                    self.write_chunk((("" if first else ",") + ",".join(batch)).encode("utf-8"))
+                self.write_chunk(b"]}")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the VeraCore Public API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--scale", type=float, default=1.0, help="Rows per report as a multiple of the sample CSVs")
+    parser.add_argument("--processing-seconds", type=float, default=1.0, help="Time each task spends Processing")
+    parser.add_argument("--processing-seconds-per-1k-rows", type=float, default=0.0,
+                        help="Extra Processing time per thousand rows in the task")
+    parser.add_argument("--too-large-rows", type=int, help="Answer 'Request too Large' for tasks with more rows")
+    args = parser.parse_args()
+
+    fake = FakeVeraCore(scale=args.scale, processing_seconds=args.processing_seconds,
+                        processing_seconds_per_1k_rows=args.processing_seconds_per_1k_rows,
+                        too_large_rows=args.too_large_rows, port=args.port)
+    print(f"Fake VeraCore listening on {fake.base_url} (set VERACORE_BASE_URL to this)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that should only load on the code paths that use them
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "office365"]
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_once(module):
+    """Import `module` in a fresh interpreter from an empty working directory"""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        )
+        measurement = json.loads(result.stdout.strip().splitlines()[-1])
+        measurement["created"] = sorted(os.listdir(workdir))
+        measurement["importtime"] = result.stderr
+    return measurement
+
+
+def slowest_imports(importtime_output, count=10):
+    """Direct imports of the measured module with the largest cumulative time, from `python -X importtime` output"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Each level of nesting is indented two more spaces; the measured module itself is at one space
+        if len(name) - len(name.lstrip()) == 3:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long it takes to import a pipeline module")
+    parser.add_argument("--module", default="reports", help="Module to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters to time")
+    args = parser.parse_args()
+
+    measurements = [measure_once(args.module) for _ in range(args.repeat)]
+    seconds = [m["seconds"] for m in measurements]
+    last = measurements[-1]
+
+    print(f"import {args.module}: median {statistics.median(seconds) * 1000:.0f} ms, "
+          f"min {min(seconds) * 1000:.0f} ms, max {max(seconds) * 1000:.0f} ms ({args.repeat} runs)")
+    print(f"Heavy libraries loaded at import: {', '.join(last['loaded']) or 'none'}")
+    print(f"Files/directories created at import: {', '.join(last['created']) or 'none'}")
+    print(f"Slowest imports made by {args.module} (cumulative):")
+    for cumulative, name in slowest_imports(last["importtime"]):
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+    return 0 if not last["created"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import psutil
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_veracore import FakeVeraCore, MANIFEST_PATH
+
+# Placeholder credentials: reports.main() refuses to start without them
+FAKE_CREDENTIALS = {
+    "USERNAME": "benchmark",
+    "PASSWORD": "benchmark",
+    "SYSTEM_ID": "benchmark",
+    "SHAREPOINT_URL": "https://benchmark.invalid",
+    "SHAREPOINT_FOLDER": "/sites/benchmark/Shared Documents/InventoryHealthDashboard",
+    "SHAREPOINT_CLIENT_ID": "benchmark",
+    "SHAREPOINT_CLIENT_SECRET": "benchmark",
+}
+
+_CHILD = """
+import sys, json, time
+sys.path[:0] = [{repo!r}, {benchmarks!r}]
+import reports
+from fake_sharepoint import LocalFolderUploader
+reports._sharepoint_uploader = LocalFolderUploader({upload_root!r}, reports.SHAREPOINT_FOLDER, upload_delay={upload_delay!r})
+started = time.perf_counter()
+success = reports.main(concurrent={concurrent!r}, max_concurrent={max_concurrent!r})
+print("BENCHMARK " + json.dumps({{"success": success, "main_seconds": time.perf_counter() - started}}))
+"""
+
+
+def write_manifest(path, report_names=None):
+    """Copy of the repo manifest, limited to report_names if given"""
+    with open(MANIFEST_PATH, encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if report_names:
+        manifest["reports"] = [r for r in manifest["reports"] if r["report_name"] in report_names]
+    with open(path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+
+def run_child(command, cwd, env, sample_interval=0.05):
+    """Run the benchmark child process, sampling its RSS to find the peak. Returns (stdout, peak bytes, seconds)"""
+    started = time.perf_counter()
+    with open(os.path.join(cwd, "benchmark_output.log"), "w+", encoding="utf-8") as output:
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=output, stderr=subprocess.STDOUT, text=True)
+        child = psutil.Process(process.pid)
+        peak_rss = 0
+        while process.poll() is None:
+            try:
+                peak_rss = max(peak_rss, child.memory_info().rss)
+            except psutil.Error:
+                pass
+            time.sleep(sample_interval)
+        elapsed = time.perf_counter() - started
+        output.seek(0)
+        return output.read(), peak_rss, elapsed
+
+
+def load_timings(workdir):
+    path = os.path.join(workdir, "state", "report_timings.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as timings_file:
+        return [json.loads(line) for line in timings_file if line.strip()]
+
+
+def run_scale(scale, args):
+    """Run reports.main() end to end against a fake VeraCore at `scale` and return its measurements"""
+    with tempfile.TemporaryDirectory(prefix=f"veracore_bench_{scale}x_") as workdir:
+        manifest_path = os.path.join(workdir, "reports_manifest.json")
+        write_manifest(manifest_path, args.reports)
+        fake = FakeVeraCore(manifest_path=manifest_path, scale=scale, processing_seconds=args.processing_seconds,
+                            too_large_rows=args.too_large_rows)
+        with fake:
+            env = dict(os.environ, **FAKE_CREDENTIALS)
+            env.update({
+                "VERACORE_BASE_URL": fake.base_url,
+                "REPORT_MANIFEST": manifest_path,
+                "PYTHONUNBUFFERED": "1",
+            })
+            script = _CHILD.format(
+                repo=REPO_ROOT,
+                benchmarks=BENCHMARK_DIR,
+                upload_root=os.path.join(workdir, "sharepoint"),
+                upload_delay=args.upload_delay,
+                concurrent=args.concurrent,
+                max_concurrent=args.max_concurrent
+            )
+            output, peak_rss, wall_seconds = run_child([sys.executable, "-c", script], workdir, env)
+
+        result_lines = [line for line in output.splitlines() if line.startswith("BENCHMARK ")]
+        if not result_lines:
+            print(output[-3000:])
+            raise RuntimeError(f"Benchmark run at {scale}x did not finish")
+        child_result = json.loads(result_lines[-1][len("BENCHMARK "):])
+        timings = [t for t in load_timings(workdir) if t.get("run_id")]
+        rows = sum(t.get("rows") or 0 for t in timings)
+        payload_bytes = sum(t.get("payload_bytes") or 0 for t in timings)
+        return {
+            "scale": scale,
+            "success": child_result["success"],
+            "wall_seconds": round(wall_seconds, 2),
+            "main_seconds": round(child_result["main_seconds"], 2),
+            "peak_rss_mb": round(peak_rss / 1024 / 1024, 1),
+            "reports": len(timings),
+            "rows": rows,
+            "payload_mb": round(payload_bytes / 1024 / 1024, 1),
+            "rows_per_second": round(rows / child_result["main_seconds"]) if child_result["main_seconds"] else None,
+            "mb_per_second": round(payload_bytes / 1024 / 1024 / child_result["main_seconds"], 2) if child_result["main_seconds"] else None,
+            "requests": dict(fake.requests),
+        }
+
+
+def print_results(results, baseline=None):
+    by_scale = {r["scale"]: r for r in baseline or []}
+    print(f"{'scale':>6}{'ok':>5}{'wall s':>10}{'main s':>10}{'peak MB':>10}{'rows':>12}{'rows/s':>10}{'MB/s':>8}{'vs base':>10}")
+    for result in results:
+        base = by_scale.get(result["scale"])
+        change = f"{result['main_seconds'] / base['main_seconds']:.2f}x" if base and base["main_seconds"] else "-"
+        print(
+            f"{result['scale']:>5}x{'yes' if result['success'] else 'NO':>5}{result['wall_seconds']:>10.2f}"
+            f"{result['main_seconds']:>10.2f}{result['peak_rss_mb']:>10.1f}{result['rows']:>12}"
+            f"{result['rows_per_second'] or 0:>10}{result['mb_per_second'] or 0:>8.2f}{change:>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run reports.main() end to end against a local fake VeraCore and upload folder"
+    )
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100],
+                        help="Data sizes as multiples of the sample CSVs in output_20251124_101245")
+    parser.add_argument("--reports", nargs="+", help="Only run these manifest reports")
+    parser.add_argument("--concurrent", action="store_true", help="Run reports concurrently")
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    parser.add_argument("--processing-seconds", type=float, default=1.0, help="Time each fake task spends Processing")
+    parser.add_argument("--upload-delay", type=float, default=0.2, help="Simulated seconds per SharePoint upload")
+    parser.add_argument("--too-large-rows", type=int, help="Fake 'Request too Large' for tasks with more rows")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        scale = int(scale) if float(scale).is_integer() else scale
+        print(f"Running at {scale}x ...", flush=True)
+        results.append(run_scale(scale, args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"args": vars(args), "results": results}, output_file, indent=2)
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import os
+import json
+import difflib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Keys that may hold the report name in a catalog entry, most likely first
+NAME_KEYS = ["ReportName", "reportName", "Name", "name", "ReportTitle", "Title"]
+
+
+class ReportCatalog:
+    """Local cache of the VeraCore report catalog (GET /api/reports).
+
+    The catalog is re-fetched only once the cached copy is older than `ttl`, and then with
+    If-None-Match / If-Modified-Since so an unchanged catalog costs a 304 and no body. If the
+    fetch fails, the stale copy is used.
+    """
+
+    def __init__(self, path, ttl=timedelta(hours=24)):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entry = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as catalog_file:
+                    self._entry = json.load(catalog_file)
+            except Exception as e:
+                logger.warning(f"Could not read report catalog cache {path}: {e}")
+
+    @property
+    def reports(self):
+        return self._entry.get("reports")
+
+    def age(self):
+        fetched_at = self._entry.get("fetched_at")
+        if not fetched_at:
+            return None
+        return datetime.now() - datetime.fromisoformat(fetched_at)
+
+    def is_fresh(self):
+        age = self.age()
+        return self.reports is not None and age is not None and age < self.ttl
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as catalog_file:
+            json.dump(self._entry, catalog_file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def load(self, client, force=False):
+        """Return the catalog entries, fetching from VeraCore only when the cache has expired"""
+        with self._lock:
+            if self.is_fresh() and not force:
+                logger.info(f"Using cached report catalog ({len(self.reports)} reports, age {self.age()})")
+                return self.reports
+
+            headers = {}
+            if self.reports is not None:
+                if self._entry.get("etag"):
+                    headers["If-None-Match"] = self._entry["etag"]
+                if self._entry.get("last_modified"):
+                    headers["If-Modified-Since"] = self._entry["last_modified"]
+
+            try:
+                response = client.get("reports", endpoint="catalog", headers=headers)
+                if response.status_code == 304 and self.reports is not None:
+                    logger.info("Report catalog not modified since last fetch")
+                elif response.status_code == 200:
+                    data = response.json()
+                    if not isinstance(data, list):
+                        raise ValueError(f"Unexpected catalog format: {type(data).__name__}")
+                    self._entry = {
+                        "reports": data,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    logger.info(f"Fetched report catalog: {len(data)} reports")
+                else:
+                    raise RuntimeError(f"API Error: {response.status_code}")
+                self._entry["fetched_at"] = datetime.now().isoformat(timespec="seconds")
+                self._save()
+            except Exception as e:
+                if self.reports is None:
+                    logger.error(f"Could not fetch report catalog: {e}")
+                    return None
+                logger.warning(f"Could not refresh report catalog, using cached copy from {self._entry.get('fetched_at')}: {e}")
+            return self.reports
+
+    def report_names(self):
+        names = set()
+        for item in self.reports or []:
+            if isinstance(item, str):
+                names.add(item)
+            elif isinstance(item, dict):
+                key = next((k for k in NAME_KEYS if item.get(k)), None)
+                if key:
+                    names.add(item[key])
+        return names
+
+    def validate(self, report_names):
+        """Map each name not found in the catalog to its closest catalog name (or None).
+
+        Returns an empty dict when the catalog is unavailable, so validation never blocks a run.
+        """
+        known = self.report_names()
+        if not known:
+            return {}
+        missing = {}
+        for name in report_names:
+            if name not in known:
+                matches = difflib.get_close_matches(name, known, n=1)
+                missing[name] = matches[0] if matches else None
+        return missing
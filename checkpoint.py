@@ -0,0 +1,71 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class RunJournal:
+    """Checkpoint journal for one pipeline run, used by --resume to retry only what did not finish.
+
+    Each report's entry records its furthest stage and what is needed to continue from there:
+    the VeraCore task ID once started, and the local files to upload once downloaded. A report
+    that fails keeps those fields with stage "failed". The file is replaced atomically on every
+    update, so a crash leaves either the previous or the new version, never a partial one.
+    """
+
+    def __init__(self, path, run_id, report_names):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {
+            "run_id": run_id,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "reports": {name: {"stage": "pending"} for name in report_names},
+        }
+        self._save()
+
+    @classmethod
+    def load(cls, path):
+        """Open an existing journal to resume it, or return None if there is none or it is unreadable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as journal_file:
+                data = json.load(journal_file)
+        except Exception as e:
+            logger.warning(f"Could not read run journal {path}: {e}")
+            return None
+        journal = cls.__new__(cls)
+        journal.path = path
+        journal._lock = threading.Lock()
+        journal.data = data
+        return journal
+
+    @property
+    def run_id(self):
+        return self.data["run_id"]
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as journal_file:
+            json.dump(self.data, journal_file, indent=2)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def entry(self, report_name):
+        return self.data["reports"].get(report_name, {})
+
+    def record(self, report_name, stage, **fields):
+        with self._lock:
+            entry = self.data["reports"].setdefault(report_name, {})
+            entry.update(fields)
+            entry["stage"] = stage
+            entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+
+    def unfinished_reports(self):
+        return [name for name, entry in self.data["reports"].items() if entry.get("stage") != "uploaded"]
@@ -0,0 +1,77 @@
+import os
+import csv
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_MODULUS = 2 ** 256
+
+
+def fingerprint_csv(path):
+    """Order-independent hash of the rows in a CSV file, computed one row at a time.
+
+    Columns are put in name order and each row is hashed separately; the row hashes are summed
+    modulo 2**256, so the result does not depend on row or column order and no copy of the data
+    is held in memory. Returns (hex digest, row count).
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, [])
+        order = sorted(range(len(header)), key=lambda i: header[i])
+        header_hash = hashlib.sha256("\x1f".join(header[i] for i in order).encode("utf-8")).hexdigest()
+
+        total = 0
+        row_count = 0
+        for record in reader:
+            record = record + [""] * (len(header) - len(record))
+            normalized = "\x1f".join(record[i].strip() for i in order)
+            total = (total + int.from_bytes(hashlib.sha256(normalized.encode("utf-8")).digest(), "big")) % _MODULUS
+            row_count += 1
+
+    digest = hashlib.sha256(f"{header_hash}:{row_count}:{total:064x}".encode("utf-8")).hexdigest()
+    return digest, row_count
+
+
+class FingerprintCache:
+    """Fingerprint and output formats of the last uploaded content per report, kept in a JSON file.
+
+    Content only counts as unchanged when it was also uploaded in the same formats, so switching
+    OUTPUT_FORMAT uploads the new format straight away.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as cache_file:
+                    self._entries = json.load(cache_file)
+            except Exception as e:
+                logger.warning(f"Could not read fingerprint cache {path}: {e}")
+
+    def matches(self, report_name, digest, formats):
+        entry = self._entries.get(report_name)
+        return entry is not None and entry["hash"] == digest and entry.get("formats") == formats
+
+    def last_upload(self, report_name):
+        entry = self._entries.get(report_name)
+        return entry.get("file") if entry else None
+
+    def update(self, report_name, digest, row_count, uploaded_file, formats):
+        with self._lock:
+            self._entries[report_name] = {
+                "hash": digest,
+                "formats": formats,
+                "rows": row_count,
+                "file": uploaded_file,
+                "uploaded_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(self._entries, cache_file, indent=2)
+            os.replace(temp_path, self.path)
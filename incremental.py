@@ -0,0 +1,135 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Date format used in VeraCore report output and filters
+DATE_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+
+def build_date_filter(field, since):
+    """VeraCore report filter selecting rows where `field` is on or after `since`"""
+    return {
+        "reportFieldTitle": field,
+        "operator": "GreaterThanOrEqual",
+        "value": since.strftime(DATE_FORMAT)
+    }
+
+
+def _read_csv(path):
+    """Read a report CSV as strings so values round-trip unchanged"""
+    import pandas as pd
+
+    try:
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+class HighWaterMarks:
+    """Latest date seen per report on its last successful incremental run, kept in a JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as marks_file:
+                    self._marks = json.load(marks_file)
+            except Exception as e:
+                logger.warning(f"Could not read high-water marks {path}: {e}")
+
+    def get(self, report_name):
+        mark = self._marks.get(report_name)
+        return datetime.strptime(mark, DATE_FORMAT) if mark else None
+
+    def set(self, report_name, mark):
+        with self._lock:
+            self._marks[report_name] = mark.strftime(DATE_FORMAT)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as marks_file:
+                json.dump(self._marks, marks_file, indent=2)
+            os.replace(temp_path, self.path)
+
+
+class IncrementalPull:
+    """Delta pull for one append-only report.
+
+    `config` names the report's date column and natural key, e.g.
+    {"date_field": "Ship Date", "key": ["Pick Slip ID", "Tracking ID"]}.
+    When a high-water mark and a local full dataset exist, only rows on or after the mark
+    (minus `lookback` for late updates) are requested and merged into the dataset; otherwise
+    the report is pulled in full and becomes the new dataset.
+    """
+
+    def __init__(self, report_name, config, dataset_path, marks, lookback=timedelta(hours=24)):
+        self.report_name = report_name
+        self.date_field = config["date_field"]
+        self.key = config["key"]
+        self.dataset_path = dataset_path
+        self.marks = marks
+        self.new_mark = None
+        self.since = None
+
+        mark = marks.get(report_name)
+        if mark and os.path.exists(dataset_path):
+            self.since = mark - lookback
+
+    @property
+    def is_delta(self):
+        return self.since is not None
+
+    def apply_filters(self, filters):
+        if not self.is_delta:
+            logger.info(f"Incremental: no high-water mark for {self.report_name}, pulling full history")
+            return filters
+        logger.info(f"Incremental: pulling {self.report_name} rows with {self.date_field} >= {self.since.strftime(DATE_FORMAT)}")
+        return list(filters) + [build_date_filter(self.date_field, self.since)]
+
+    def merge(self, output_path):
+        """Merge the pulled rows at output_path into the full dataset and write the full dataset back to output_path"""
+        import pandas as pd
+
+        delta = _read_csv(output_path)
+        existing = _read_csv(self.dataset_path) if self.is_delta else pd.DataFrame()
+        if self.is_delta and delta.empty and not len(delta.columns):
+            merged = existing
+            logger.info(f"Incremental: no new rows for {self.report_name}")
+        elif self.is_delta and not set(self.key) <= set(existing.columns):
+            # An empty dataset (e.g. from a first pull that returned no rows) is no prior data
+            merged = delta
+            logger.info(f"Incremental: no existing rows for {self.report_name}, the {len(delta)} delta rows become the dataset")
+        elif self.is_delta:
+            # Rows pulled again replace their earlier version
+            replaced = pd.MultiIndex.from_frame(existing[self.key]).isin(pd.MultiIndex.from_frame(delta[self.key]))
+            merged = pd.concat([existing[~replaced], delta], ignore_index=True)
+            logger.info(
+                f"Incremental: merged {len(delta)} delta rows into {len(existing)} existing rows "
+                f"({int(replaced.sum())} replaced) -> {len(merged)} rows"
+            )
+        else:
+            merged = delta
+
+        os.makedirs(os.path.dirname(self.dataset_path) or ".", exist_ok=True)
+        temp_path = f"{self.dataset_path}.tmp"
+        merged.to_csv(temp_path, index=False)
+        os.replace(temp_path, self.dataset_path)
+        shutil.copyfile(self.dataset_path, output_path)
+
+        if self.date_field not in merged.columns:
+            return len(merged)
+        dates = pd.to_datetime(merged[self.date_field], format=DATE_FORMAT, errors="coerce")
+        if dates.notna().any():
+            self.new_mark = dates.max().to_pydatetime()
+        return len(merged)
+
+    def commit(self):
+        """Advance the high-water mark once the merged dataset has been delivered"""
+        if self.new_mark is not None:
+            self.marks.set(self.report_name, self.new_mark)
+            logger.info(f"Incremental: high-water mark for {self.report_name} is now {self.new_mark.strftime(DATE_FORMAT)}")
@@ -0,0 +1,151 @@
+import os
+import logging
+from report_schemas import apply_schema, get_schema
+
+logger = logging.getLogger(__name__)
+
+UNITS_REPORT = "unit-details"
+LOCATIONS_REPORT = "WarehouseLocations"
+
+# unit-details names the zone by its description ("Bulk Storage") and WarehouseLocations by its ID
+# ("BLK"), so units are matched to locations on the rest of the address; Zone ID comes from the location
+UNIT_LOCATION_KEY = ["Building", "Aisle", "Rack", "Level"]
+LOCATION_COLUMNS = {"Building ID": "Building", "Zone ID": "Zone ID"}
+
+AGING_BUCKET_EDGES = [0, 30, 60, 90, 180, 365]
+AGING_BUCKET_LABELS = ["0-30", "31-60", "61-90", "91-180", "181-365", "365+"]
+UNKNOWN_BUCKET = "unknown"
+DEFAULT_DORMANT_DAYS = 180
+
+
+def load_report_csv(path, report_name):
+    """Read a report CSV as strings and convert it to the report's column types"""
+    import pandas as pd
+
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return apply_schema(df, get_schema(report_name))
+
+
+def join_units_to_locations(units, locations):
+    """Attach each unit's location (Location ID, Zone ID, status) through an index on the location address.
+
+    A duplicated address in the locations report keeps its first row, so the join never multiplies units.
+    """
+    locations = locations.rename(columns=LOCATION_COLUMNS)
+    location_index = (
+        locations.drop_duplicates(UNIT_LOCATION_KEY)
+        .set_index(UNIT_LOCATION_KEY)[["Location ID", "Zone ID", "Location Status"]]
+    )
+    joined = units.join(location_index, on=UNIT_LOCATION_KEY)
+    unmatched = int(joined["Location ID"].isna().sum())
+    if unmatched:
+        logger.warning(f"{unmatched} of {len(units)} units have no matching warehouse location")
+    return joined
+
+
+def add_aging(units, as_of, dormant_days=DEFAULT_DORMANT_DAYS):
+    """Add Days On Hand, Aging Bucket and Dormant columns.
+
+    A unit is dormant when it has been on hand at least dormant_days with stock and nothing marked
+    for picking. Units without a receipt date get the "unknown" bucket and are never dormant.
+    """
+    import numpy as np
+    import pandas as pd
+
+    days = (pd.Timestamp(as_of) - units["Receipt Date"]).dt.days.clip(lower=0)
+    units["Days On Hand"] = days.astype("Int64")
+    buckets = pd.cut(days, bins=AGING_BUCKET_EDGES + [np.inf], labels=AGING_BUCKET_LABELS, right=True, include_lowest=True)
+    units["Aging Bucket"] = buckets.cat.add_categories([UNKNOWN_BUCKET]).fillna(UNKNOWN_BUCKET)
+    on_hand = units["Total On Hand"].fillna(0)
+    marked = units["Total Marked Pieces"].fillna(0)
+    units["Dormant"] = ((days >= dormant_days) & (on_hand > 0) & (marked == 0)).fillna(False).astype(bool)
+    return units
+
+
+def aging_by_owner(units):
+    """Units and pieces on hand per product owner and aging bucket"""
+    table = (
+        units.groupby(["Product Owner Name", "Aging Bucket"], observed=True)
+        .agg(Units=("Unit ID", "size"), On_Hand=("Total On Hand", "sum"))
+        .reset_index()
+    )
+    return table.rename(columns={"On_Hand": "Total On Hand"})
+
+
+def on_hand_by_owner(units):
+    """Per product owner: units, pieces on hand and marked, age of stock and dormant units"""
+    units = units.assign(
+        Dormant_On_Hand=units["Total On Hand"].where(units["Dormant"], 0),
+    )
+    table = (
+        units.groupby("Product Owner Name", observed=True)
+        .agg(
+            Units=("Unit ID", "size"),
+            Products=("Product ID", "nunique"),
+            Total_On_Hand=("Total On Hand", "sum"),
+            Total_Marked_Pieces=("Total Marked Pieces", "sum"),
+            Average_Days_On_Hand=("Days On Hand", "mean"),
+            Max_Days_On_Hand=("Days On Hand", "max"),
+            Dormant_Units=("Dormant", "sum"),
+            Dormant_On_Hand=("Dormant_On_Hand", "sum"),
+        )
+        .reset_index()
+        .sort_values("Total_On_Hand", ascending=False)
+    )
+    table["Average_Days_On_Hand"] = table["Average_Days_On_Hand"].astype("Float64").round(1)
+    return table.rename(columns=lambda column: column.replace("_", " "))
+
+
+def dormant_units(units):
+    """The dormant units themselves, oldest first"""
+    columns = ["Unit ID", "Product ID", "Product Owner Name", "Zone ID", "Location ID",
+               "Receipt Date", "Days On Hand", "Total On Hand"]
+    return units.loc[units["Dormant"], columns].sort_values("Days On Hand", ascending=False)
+
+
+def zone_occupancy(units, locations):
+    """Per zone: locations, in-use and open counts and rates, and the stock stored there"""
+    import numpy as np
+
+    locations = locations.rename(columns=LOCATION_COLUMNS)
+    open_flag = locations["Open Location"].fillna(0).astype("int64")
+    zones = (
+        locations.assign(Open=open_flag, In_Use=(open_flag == 0).astype("int64"))
+        .groupby("Zone ID", observed=True)
+        .agg(Locations=("Location ID", "size"), In_Use=("In_Use", "sum"), Open=("Open", "sum"))
+    )
+    stock = (
+        units.dropna(subset=["Zone ID"])
+        .groupby("Zone ID", observed=True)
+        .agg(Units=("Unit ID", "size"), Locations_With_Units=("Location ID", "nunique"), Total_On_Hand=("Total On Hand", "sum"))
+    )
+    table = zones.join(stock, how="outer").fillna(0)
+    total = table["Locations"].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["Occupancy Rate"] = np.where(total > 0, table["In_Use"].to_numpy(dtype="float64") / total, np.nan).round(4)
+        table["Open Location Rate"] = np.where(total > 0, table["Open"].to_numpy(dtype="float64") / total, np.nan).round(4)
+    for column in ["Locations", "In_Use", "Open", "Units", "Locations_With_Units", "Total_On_Hand"]:
+        table[column] = table[column].astype("int64")
+    table = table.reset_index().sort_values("Zone ID")
+    return table.rename(columns=lambda column: column.replace("_", " "))
+
+
+def compute_inventory_metrics(units, locations, as_of, dormant_days=DEFAULT_DORMANT_DAYS):
+    """Inventory-health tables from typed unit-details and WarehouseLocations frames. Returns name -> DataFrame"""
+    units = add_aging(join_units_to_locations(units, locations), as_of, dormant_days)
+    return {
+        "inventory_aging": aging_by_owner(units),
+        "inventory_owner_on_hand": on_hand_by_owner(units),
+        "inventory_dormant_units": dormant_units(units),
+        "inventory_zone_occupancy": zone_occupancy(units, locations),
+    }
+
+
+def write_metric_tables(tables, folder, date_format="%m/%d/%Y %H:%M:%S"):
+    """Write each table as <name>.csv in folder. Returns name -> path"""
+    paths = {}
+    for name, table in tables.items():
+        path = os.path.join(folder, f"{name}.csv")
+        table.to_csv(path, index=False, date_format=date_format)
+        paths[name] = path
+    return paths
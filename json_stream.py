@@ -0,0 +1,164 @@
+import os
+import csv
+import json
+import codecs
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JSONStream:
+    """Minimal incremental reader over an iterator of text chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        # Byte chunks can split a multi-byte character, so decode them incrementally
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def _more(self):
+        """Append the next chunk, dropping everything already consumed. Returns False at end of stream"""
+        chunk = next(self._chunks, None)
+        while chunk is not None and not chunk:
+            chunk = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            return False
+        if isinstance(chunk, bytes):
+            chunk = self._text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._more():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.exhausted and self._more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks, key="Data"):
+    """Yield the items of the top-level `key` array of a JSON object one at a time.
+
+    Only one chunk plus the item being decoded is held in memory, so the size of the
+    payload does not matter.
+    """
+    stream = _JSONStream(chunks)
+    stream.expect("{")
+    found = False
+    if stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            name = stream.value()
+            stream.expect(":")
+            if name == key:
+                found = True
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ",":
+                            stream.pos += 1
+                        else:
+                            stream.expect("]")
+                            break
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.pos += 1
+            else:
+                stream.expect("}")
+                break
+    if not found:
+        raise KeyError(key)
+
+
+def write_rows_to_csv(rows, output_path, batch_size=5000):
+    """Write an iterable of row dicts to CSV in batches of batch_size rows.
+
+    Columns are ordered by first appearance, the same as pd.DataFrame(list_of_dicts).
+    Returns the number of rows written.
+    """
+    import pandas as pd
+
+    columns = None
+    row_count = 0
+    extended = False
+    batch = []
+
+    with open(output_path, "w", newline="", encoding="utf-8") as output_file:
+        def write_batch():
+            nonlocal columns, extended
+            df = pd.DataFrame(batch)
+            if columns is None:
+                columns = list(df.columns)
+                df.to_csv(output_file, index=False)
+                return
+            new_columns = [column for column in df.columns if column not in columns]
+            if new_columns:
+                logger.warning(f"New columns appeared mid-stream in {os.path.basename(output_path)}: {new_columns}")
+                columns.extend(new_columns)
+                extended = True
+            df.reindex(columns=columns).to_csv(output_file, index=False, header=False)
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                write_batch()
+                row_count += len(batch)
+                batch = []
+        if batch or columns is None:
+            write_batch()
+            row_count += len(batch)
+
+    if extended:
+        _rewrite_header(output_path, columns)
+    return row_count
+
+
+def _rewrite_header(output_path, columns):
+    """Rewrite the header with the full column list and pad rows written before new columns appeared"""
+    temp_path = f"{output_path}.tmp"
+    with open(output_path, newline="", encoding="utf-8") as source, \
+            open(temp_path, "w", newline="", encoding="utf-8") as target:
+        reader = csv.reader(source)
+        writer = csv.writer(target, lineterminator=os.linesep)
+        next(reader, None)
+        writer.writerow(columns)
+        for record in reader:
+            writer.writerow(record + [""] * (len(columns) - len(record)))
+    os.replace(temp_path, output_path)
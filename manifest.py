@@ -0,0 +1,103 @@
+import os
+import re
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports_manifest.json")
+
+_FREQUENCY_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_frequency(value):
+    """Convert a frequency such as "15m", "6h", "1d" or a number of minutes to a timedelta"""
+    if isinstance(value, (int, float)):
+        return timedelta(minutes=value)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([mhd])\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid frequency '{value}', expected e.g. 15m, 6h or 1d")
+    return timedelta(**{_FREQUENCY_UNITS[match.group(2)]: float(match.group(1))})
+
+
+def load_manifest(path=DEFAULT_MANIFEST_PATH):
+    """Read the report manifest and return its reports ordered by priority (1 runs first).
+
+    Each report needs "report_name" and "output_csv". "filters" defaults to [], "frequency" to
+    every run, "priority" to 5; "timeout" and "incremental" are passed through unchanged.
+    """
+    with open(path, encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    reports = []
+    seen = set()
+    for report in manifest["reports"]:
+        for key in ("report_name", "output_csv"):
+            if not report.get(key):
+                raise ValueError(f"Manifest entry is missing '{key}': {report}")
+        if report["report_name"] in seen:
+            raise ValueError(f"Report '{report['report_name']}' appears more than once in {path}")
+        seen.add(report["report_name"])
+
+        report = dict(report)
+        report.setdefault("filters", [])
+        report.setdefault("priority", 5)
+        report["interval"] = parse_frequency(report["frequency"]) if report.get("frequency") else timedelta(0)
+        reports.append(report)
+    return sorted(reports, key=lambda r: r["priority"])
+
+
+class ScheduleState:
+    """Start time of the last successful run per report, kept in a JSON file"""
+
+    def __init__(self, path, grace=timedelta(minutes=2), retry_after=timedelta(minutes=5)):
+        self.path = path
+        # A report counts as due slightly early, so a 15 minute trigger does not skip a 15m report
+        # whose previous run started a few seconds late
+        self.grace = grace
+        # A failed report is retried after this long (or its frequency, if shorter) rather than on every check
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._last_runs = {}
+        self._last_failures = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as state_file:
+                    self._last_runs = json.load(state_file)
+            except Exception as e:
+                logger.warning(f"Could not read schedule state {path}: {e}")
+
+    def last_run(self, report_name):
+        last_run = self._last_runs.get(report_name)
+        return datetime.fromisoformat(last_run) if last_run else None
+
+    def next_due(self, report):
+        last_run = self.last_run(report["report_name"])
+        next_due = last_run + report["interval"] if last_run else None
+        last_failure = self._last_failures.get(report["report_name"])
+        if last_failure:
+            retry_at = last_failure + min(self.retry_after, report["interval"]) + self.grace
+            next_due = max(next_due, retry_at) if next_due else retry_at
+        return next_due
+
+    def is_due(self, report, now=None):
+        next_due = self.next_due(report)
+        return next_due is None or (now or datetime.now()) >= next_due - self.grace
+
+    def due_reports(self, reports, now=None):
+        now = now or datetime.now()
+        return [report for report in reports if self.is_due(report, now)]
+
+    def mark_failed(self, report_name, started_at):
+        self._last_failures[report_name] = started_at
+
+    def mark_run(self, report_name, started_at):
+        with self._lock:
+            self._last_failures.pop(report_name, None)
+            self._last_runs[report_name] = started_at.isoformat(timespec="seconds")
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as state_file:
+                json.dump(self._last_runs, state_file, indent=2)
+            os.replace(temp_path, self.path)
@@ -0,0 +1,76 @@
+import os
+import logging
+from datetime import datetime
+from incremental import DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+
+def date_range_filters(field, start, end):
+    """VeraCore filters selecting rows with start <= field < end. A missing bound is left open"""
+    filters = []
+    if start is not None:
+        filters.append({"reportFieldTitle": field, "operator": "GreaterThanOrEqual", "value": start.strftime(DATE_FORMAT)})
+    if end is not None:
+        filters.append({"reportFieldTitle": field, "operator": "LessThan", "value": end.strftime(DATE_FORMAT)})
+    return filters
+
+
+def split_range(start, end, parts, floor, ceiling=None):
+    """Split [start, end) into `parts` consecutive half-open ranges.
+
+    An open bound (None) stays open on the outermost range, so together the ranges still cover
+    every date; `floor` and `ceiling` (default now) only place the boundaries in between.
+    Rows whose date field is empty match no range (see the partition's empty_date_filters).
+    """
+    low = start or floor
+    high = end or ceiling or datetime.now()
+    if parts < 2 or high <= low:
+        return [(start, end)]
+    step = (high - low) / parts
+    boundaries = [(low + step * i).replace(microsecond=0) for i in range(1, parts)]
+    edges = [start] + boundaries + [end]
+    return [(edges[i], edges[i + 1]) for i in range(parts)]
+
+
+def describe_range(start, end):
+    low = start.strftime(DATE_FORMAT) if start else "-inf"
+    high = end.strftime(DATE_FORMAT) if end else "+inf"
+    return f"[{low}, {high})"
+
+
+def count_undated_rows(path, date_field):
+    """Rows of a report CSV whose date_field is empty, or None if the file or column is missing"""
+    import pandas as pd
+
+    try:
+        dates = pd.read_csv(path, dtype=str, keep_default_na=False, usecols=[date_field])[date_field]
+    except (OSError, ValueError, pd.errors.EmptyDataError):
+        return None
+    return int((dates.str.strip() == "").sum())
+
+
+def combine_partitions(paths, output_path):
+    """Concatenate partition CSVs into output_path. Returns the row count.
+
+    The date ranges are disjoint, so every row is kept: a repeated row is a real row of the report.
+    Values are read as strings so they round-trip unchanged; columns keep their first-seen order.
+    """
+    import pandas as pd
+
+    frames = []
+    for path in paths:
+        try:
+            frames.append(pd.read_csv(path, dtype=str, keep_default_na=False))
+        except pd.errors.EmptyDataError:
+            continue
+    if not frames:
+        open(output_path, "w").close()
+        return 0
+
+    combined = pd.concat(frames, ignore_index=True).fillna("")
+    combined.to_csv(output_path, index=False)
+    for path in paths:
+        if os.path.exists(path) and os.path.abspath(path) != os.path.abspath(output_path):
+            os.remove(path)
+    return len(combined)
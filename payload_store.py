@@ -0,0 +1,165 @@
+import os
+import gzip
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class PayloadWriter:
+    """Compresses a raw payload into the store as it is written, hashing it on the way"""
+
+    def __init__(self, store, entry):
+        self.store = store
+        self.entry = entry
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._temp_path = os.path.join(store.objects_folder, f"incoming_{uuid.uuid4().hex}.json.gz")
+        os.makedirs(store.objects_folder, exist_ok=True)
+        self._file = gzip.open(self._temp_path, "wb", compresslevel=store.compresslevel)
+
+    def write(self, data):
+        self._hash.update(data)
+        self._size += len(data)
+        self._file.write(data)
+
+    def commit(self):
+        """Move the payload to its content address (kept if already stored) and add the index entry"""
+        self._file.close()
+        digest = self._hash.hexdigest()
+        object_path = self.store.object_path(digest)
+        if os.path.exists(object_path):
+            os.remove(self._temp_path)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.replace(self._temp_path, object_path)
+        self.entry.update({
+            "digest": digest,
+            "bytes": self._size,
+            "stored_bytes": os.path.getsize(object_path),
+        })
+        self.store.add_entry(self.entry)
+        return digest
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+
+class PayloadStore:
+    """Content-addressed local store of raw VeraCore report payloads, for rebuilding outputs without refetching.
+
+    Payloads are gzipped under objects/<digest[:2]>/<digest>.json.gz, keyed by the SHA-256 of the
+    raw bytes, so an unchanged report costs no extra space. index.json lists one entry per captured
+    task (run ID, report, task ID, timestamp, digest, sizes) and is replaced atomically. evict()
+    drops entries older than max_age and then the oldest runs until the store fits in max_bytes.
+    """
+
+    def __init__(self, root, max_bytes=2 * 1024 ** 3, max_age=timedelta(days=14), compresslevel=6):
+        self.root = root
+        self.objects_folder = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._entries = []
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as index_file:
+                    self._entries = json.load(index_file)
+            except Exception as e:
+                logger.warning(f"Could not read payload index {self.index_path}: {e}")
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump(self._entries, index_file, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_folder, digest[:2], f"{digest}.json.gz")
+
+    def writer(self, run_id, report_name, task_id, **fields):
+        """Start capturing one task's payload; call commit() once it downloaded completely, else discard()"""
+        entry = {
+            "run_id": run_id,
+            "report": report_name,
+            "task_id": task_id,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        }
+        entry.update(fields)
+        return PayloadWriter(self, entry)
+
+    def add_entry(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            self._save()
+
+    def remove_entries(self, run_id, report_name):
+        """Forget a report's captures in one run, e.g. the partitions of a report that failed as a whole.
+        Their payloads are deleted by the next evict() unless another entry uses them"""
+        with self._lock:
+            self._entries = [e for e in self._entries if not (e["run_id"] == run_id and e["report"] == report_name)]
+            self._save()
+
+    def load(self, digest):
+        with gzip.open(self.object_path(digest), "rb") as payload_file:
+            return payload_file.read()
+
+    def runs(self):
+        """Captured run IDs, oldest first"""
+        with self._lock:
+            return sorted({entry["run_id"] for entry in self._entries})
+
+    def entries(self, run_id):
+        """Index entries of one run ("latest" for the most recent), in capture order"""
+        if run_id == "latest":
+            runs = self.runs()
+            run_id = runs[-1] if runs else None
+        with self._lock:
+            return [dict(entry) for entry in self._entries if entry["run_id"] == run_id]
+
+    def evict(self, now=None):
+        """Apply the age and size limits, then delete payloads no entry refers to. Returns the entries dropped"""
+        now = now or datetime.now()
+        with self._lock:
+            cutoff = (now - self.max_age).isoformat(timespec="seconds")
+            kept = [entry for entry in self._entries if entry["timestamp"] >= cutoff]
+
+            # Drop whole runs, oldest first, until the distinct payloads fit
+            def stored_size(entries):
+                return sum({entry["digest"]: entry["stored_bytes"] for entry in entries}.values())
+
+            while kept and stored_size(kept) > self.max_bytes:
+                oldest_run = min(entry["run_id"] for entry in kept)
+                kept = [entry for entry in kept if entry["run_id"] != oldest_run]
+
+            dropped = len(self._entries) - len(kept)
+            self._entries = kept
+            if dropped:
+                self._save()
+            referenced = {entry["digest"] for entry in kept}
+
+        removed_bytes = 0
+        if os.path.isdir(self.objects_folder):
+            for folder, _, files in os.walk(self.objects_folder):
+                for name in files:
+                    path = os.path.join(folder, name)
+                    if name.startswith("incoming_"):
+                        # Left behind by an interrupted capture once it is older than the age limit
+                        if datetime.fromtimestamp(os.path.getmtime(path)) >= now - self.max_age:
+                            continue
+                    elif name.split(".")[0] in referenced:
+                        continue
+                    removed_bytes += os.path.getsize(path)
+                    os.remove(path)
+        if dropped or removed_bytes:
+            logger.info(f"Payload store: dropped {dropped} entries, freed {removed_bytes / 1024 / 1024:.1f} MB")
+        return dropped
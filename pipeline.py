@@ -0,0 +1,163 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Completed:
+    """Returned by a stage function to finish an item early with `value`, skipping the later stages"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Stage:
+    """One pipeline stage: a pool of worker threads reading from a bounded input queue"""
+
+    def __init__(self, name, func, workers=1, queue_size=2):
+        self.name = name
+        self.func = func
+        self.workers = max(workers, 1)
+        self.queue = queue.Queue(maxsize=max(queue_size, 1))
+        self.threads = []
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+
+
+class Pipeline:
+    """Worker pools connected by bounded queues, so each stage of one item overlaps other items' stages.
+
+    submit() returns a Future that resolves with the last stage's result, or with the exception a
+    stage raised. A full queue blocks the stage feeding it, which keeps slow downstream stages from
+    piling work up in memory; the time spent blocked is reported as that stage's blocked_seconds.
+    """
+
+    def __init__(self, stages):
+        """`stages` is a list of (name, func, workers, queue_size); func(item) returns the next stage's item"""
+        self.stages = [Stage(*stage) for stage in stages]
+        self._lock = threading.Lock()
+        self._started = None
+
+    def start(self):
+        self._started = time.monotonic()
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,), name=f"{stage.name}-{worker}", daemon=True)
+                thread.start()
+                stage.threads.append(thread)
+        return self
+
+    def submit(self, item):
+        future = Future()
+        self._put(None, 0, (future, item))
+        return future
+
+    def in_stage(self, name):
+        """Items queued for or being worked on in the named stage"""
+        stage = self._stage(name)
+        with self._lock:
+            return stage.queue.qsize() + stage.active
+
+    def close(self):
+        """Let the queued items drain through every stage, then stop the workers"""
+        for stage in self.stages:
+            for _ in stage.threads:
+                stage.queue.put(_STOP)
+            for thread in stage.threads:
+                thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _stage(self, name):
+        return next(stage for stage in self.stages if stage.name == name)
+
+    def _put(self, source, index, job):
+        stage = self.stages[index]
+        started = time.monotonic()
+        stage.queue.put(job)
+        with self._lock:
+            stage.max_queue_depth = max(stage.max_queue_depth, stage.queue.qsize())
+            if source is not None:
+                source.blocked_seconds += time.monotonic() - started
+
+    def _work(self, index):
+        stage = self.stages[index]
+        while True:
+            job = stage.queue.get()
+            if job is _STOP:
+                return
+            future, item = job
+            with self._lock:
+                stage.active += 1
+            started = time.monotonic()
+            try:
+                result = stage.func(item)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            with self._lock:
+                stage.active -= 1
+                stage.busy_seconds += time.monotonic() - started
+                stage.processed += 1
+                stage.failed += int(error is not None)
+
+            if error is not None:
+                future.set_exception(error)
+            elif isinstance(result, Completed):
+                future.set_result(result.value)
+            elif index + 1 < len(self.stages):
+                # Counted against this stage while it waits for room downstream
+                with self._lock:
+                    stage.active += 1
+                self._put(stage, index + 1, (future, result))
+                with self._lock:
+                    stage.active -= 1
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        """Per stage: workers, items processed/failed, utilization (busy time / worker time) and queue depth"""
+        elapsed = time.monotonic() - self._started if self._started else 0
+        with self._lock:
+            return {
+                stage.name: {
+                    "workers": stage.workers,
+                    "processed": stage.processed,
+                    "failed": stage.failed,
+                    "active": stage.active,
+                    "queue_depth": stage.queue.qsize(),
+                    "max_queue_depth": stage.max_queue_depth,
+                    "queue_size": stage.queue.maxsize,
+                    "busy_seconds": round(stage.busy_seconds, 2),
+                    "blocked_seconds": round(stage.blocked_seconds, 2),
+                    "utilization": round(stage.busy_seconds / (elapsed * stage.workers), 3) if elapsed else 0.0,
+                }
+                for stage in self.stages
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info("Pipeline stage utilization:")
+        for name, stage in stats.items():
+            logger.info(
+                f"  {name}: {stage['processed']} items on {stage['workers']} workers, "
+                f"{stage['utilization'] * 100:.0f}% busy, {stage['blocked_seconds']:.1f}s blocked downstream, "
+                f"max queue {stage['max_queue_depth']}/{stage['queue_size']}"
+            )
+        busiest = max(stats.items(), key=lambda item: item[1]["utilization"], default=None)
+        if busiest and busiest[1]["processed"]:
+            logger.info(f"  Bottleneck stage: {busiest[0]}")
+        return stats
@@ -0,0 +1,121 @@
+import os
+import json
+import random
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class FixedPolling:
+    """The original behaviour: poll right away, then every `interval` seconds up to `max_attempts` polls.
+
+    With a `deadline` (a report's own timeout), polling goes on at the same interval until that many
+    seconds have passed instead.
+    """
+
+    def __init__(self, interval=3, max_attempts=20, deadline=None):
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.use_deadline = deadline is not None
+        self.deadline = deadline if self.use_deadline else interval * max_attempts
+
+    def next_delay(self, attempt, elapsed):
+        """Seconds to wait before poll number `attempt` (0-based)"""
+        if attempt == 0:
+            return 0
+        if self.use_deadline:
+            return max(0.0, min(self.interval, self.deadline - elapsed))
+        return self.interval
+
+    def expired(self, attempt, elapsed):
+        if self.use_deadline:
+            return elapsed >= self.deadline
+        return attempt >= self.max_attempts
+
+
+class AdaptivePolling:
+    """Exponential backoff with jitter, aimed at the report's usual completion time.
+
+    When the report's expected duration is known, the first poll is scheduled just before it;
+    otherwise polling starts at `initial_interval` and backs off by `backoff_factor` per attempt,
+    capped at `max_interval`. The task is abandoned once `deadline` seconds have passed.
+    """
+
+    def __init__(self, initial_interval=1.0, backoff_factor=1.5, max_interval=15.0, jitter=0.2,
+                 deadline=600, expected_duration=None, lead=0.9):
+        self.initial_interval = initial_interval
+        self.backoff_factor = backoff_factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.expected_duration = expected_duration
+        self.lead = lead
+
+    def next_delay(self, attempt, elapsed):
+        if attempt == 0 and self.expected_duration:
+            delay = max(self.expected_duration * self.lead - elapsed, self.initial_interval)
+        else:
+            # Back off from the first poll, or from the expected-duration poll if that one missed
+            step = attempt - 1 if self.expected_duration else attempt
+            delay = min(self.initial_interval * self.backoff_factor ** max(step, 0), self.max_interval)
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, min(delay, self.deadline - elapsed))
+
+    def expired(self, attempt, elapsed):
+        return elapsed >= self.deadline
+
+
+class ReportDurationHistory:
+    """Exponentially weighted average of how long each report took to reach Done, kept in a JSON file"""
+
+    def __init__(self, path, weight=0.3):
+        self.path = path
+        self.weight = weight
+        self._lock = threading.Lock()
+        self._durations = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as history_file:
+                    self._durations = json.load(history_file)
+            except Exception as e:
+                logger.warning(f"Could not read report duration history {path}: {e}")
+
+    def expected(self, report_name):
+        entry = self._durations.get(report_name)
+        return entry["average"] if entry else None
+
+    def record(self, report_name, seconds):
+        with self._lock:
+            entry = self._durations.get(report_name)
+            if entry:
+                entry["average"] = (1 - self.weight) * entry["average"] + self.weight * seconds
+                entry["runs"] += 1
+            else:
+                entry = {"average": seconds, "runs": 1}
+            entry["last"] = seconds
+            self._durations[report_name] = entry
+            self._save()
+
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as history_file:
+            json.dump(self._durations, history_file, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def make_polling_strategy(name, expected_duration=None, deadline=600, interval=3, max_attempts=20, timeout=None):
+    """Build the polling strategy called `name` ("adaptive" or "fixed").
+
+    timeout is the report's own deadline from the manifest; it replaces `deadline` (adaptive) and
+    the attempt cap (fixed).
+    """
+    if name == "fixed":
+        return FixedPolling(interval=interval, max_attempts=max_attempts, deadline=timeout)
+    if name == "adaptive":
+        deadline = timeout or deadline
+        # Never give up on a report before three times its usual duration
+        if expected_duration:
+            deadline = max(deadline, expected_duration * 3)
+        return AdaptivePolling(deadline=deadline, expected_duration=expected_duration)
+    raise ValueError(f"Unknown polling strategy: {name}")
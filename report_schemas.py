@@ -0,0 +1,257 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Date format used by every VeraCore report
+DATE_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Every column of each VeraCore report, in report order, with its type. A column the report gains
+# is kept as a string (which also protects zero-padded codes such as Building "01" and Rack "060")
+# and reported as schema drift, as is a listed column the report no longer has.
+#   datetime - parsed with DATE_FORMAT
+#   category - low-cardinality text
+#   string   - free text and identifiers, stored as Arrow strings
+#   int      - whole numbers (nullable)
+#   float    - decimals
+REPORT_SCHEMAS = {
+    "unit-details": {
+        "Product ID": "string",
+        "Product Description": "string",
+        "Version": "category",
+        "Receipt Date": "datetime",
+        "Product Owner Name": "category",
+        "Unit ID": "string",
+        "Building": "category",
+        "Zone": "category",
+        "Aisle": "string",
+        "Rack": "string",
+        "Level": "string",
+        "Total On Hand": "int",
+        "Total Marked Pieces": "int",
+    },
+    "returns-products": {
+        "Order ID": "string",
+        "Pick Slip ID": "string",
+        "Product ID": "string",
+        "Product Description": "string",
+        "Date/Time Returned": "datetime",
+        "Return Line Qty Returned": "int",
+        "Return Line Disposition": "category",
+    },
+    "expectedd-all": {
+        "Product ID": "string",
+        "Product Description": "string",
+        "Product Owner ID": "category",
+        "Version": "category",
+        "Product Owner Name": "category",
+        "Expected Arrival Date / Time Entered": "datetime",
+        "Anticipated Arrival Date & Time": "datetime",
+        "Expected Arrival Client Purchase Order": "string",
+        "Expected Arrival Shipped From": "string",
+        "Expected Arrival Shipping Method": "category",
+        "Expected Arrival Comments": "string",
+        "Initial Expected Quantity": "int",
+        "Total Expected Quantity Received (All Receipts)": "float",
+        "Expected Arrival Product Line Complete": "int",
+        "Product First UPC Code": "string",
+        "Product Origin System": "category",
+        "Expected Arrival Date / Time Last Modified": "datetime",
+        "Expected Arrival Our Purchase Order": "string",
+    },
+    "unit-billing": {
+        "Product ID": "string",
+        "Product Description": "string",
+        "Product Owner ID": "category",
+        "Product Owner Description": "category",
+        "Receipt Date": "datetime",
+        "Unit ID Received": "string",
+        "Unit Type Received": "category",
+        "Total Pieces Received": "int",
+        "Unit Volume Received": "float",
+        "Billing Eligibility Date": "datetime",
+        "Split Month Billing Period": "int",
+        "Long Term Storage Start Date": "datetime",
+    },
+    "WarehouseLocations": {
+        "Aisle": "string",
+        "Rack": "string",
+        "Level": "string",
+        "Location ID": "string",
+        "Location Status": "category",
+        "Open Location": "int",
+        "Building ID": "category",
+        "Zone ID": "category",
+    },
+    "Shipping Report": {
+        "Order ID": "string",
+        "Pick Slip ID": "string",
+        "Ship To-Full Name": "string",
+        "Ship To-Company": "string",
+        "Ship To-Address 1": "string",
+        "Ship To-Address 2": "string",
+        "Ship To-City": "string",
+        "Ship To-State": "category",
+        "Ship To-Zip/Postal Code": "string",
+        "Ship To-Country": "category",
+        "Tracking ID": "string",
+        "Package Type": "category",
+        "Ship Date": "datetime",
+        "Published Freight": "float",
+        "Package Identifier": "string",
+        "Freight Carrier": "category",
+        "Carrier Code": "category",
+        "Freight Service": "category",
+        "Void Flag": "int",
+    },
+    "pickslip_activity": {
+        "PPU Id": "string",
+        "Wave ID": "category",
+        "Wave Description": "category",
+        "Material Handler Name": "category",
+        "Picking Type": "category",
+        "Activity Start Time": "datetime",
+        "Activity End Time": "datetime",
+        "Activity Elapsed Minutes": "float",
+        "Orders Picked": "int",
+        "Lines Picked": "int",
+        "Products Picked": "int",
+        "Pieces Picked": "int",
+        "Exceptions Recorded": "int",
+        "Activity Suspended": "int",
+    },
+    "exceptions": {
+        "Order ID": "string",
+        "Pick Slip ID": "string",
+        "PPU Id": "string",
+        "Product ID": "string",
+        "Product Description": "string",
+        "Version": "category",
+        "Building": "category",
+        "Zone": "category",
+        "Aisle": "string",
+        "Rack": "string",
+        "Level": "string",
+        "Wave ID": "category",
+        "Exception Recorded Date/Time": "datetime",
+        "Material Handler Name": "category",
+        "Exception Type": "category",
+        "Exception Status": "category",
+        "Exception Comments": "string",
+    },
+}
+
+
+def get_schema(report_name):
+    return REPORT_SCHEMAS.get(report_name, {})
+
+
+def apply_schema(df, schema, keep_unparsed=False):
+    """Convert a DataFrame of report values to the column types in `schema`. Empty values become nulls.
+
+    Values that are not valid for a datetime or numeric column (including decimals in an int column)
+    become nulls as well, unless keep_unparsed is set: the column then stays text, so writing the
+    frame back out loses nothing.
+    """
+    import pandas as pd
+
+    for column in df.columns:
+        kind = schema.get(column, "string")
+        values = df[column].astype("string[pyarrow]").replace("", pd.NA)
+        if kind == "datetime":
+            converted = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+        elif kind == "category":
+            converted = values.astype("category")
+        elif kind in ("int", "float"):
+            numbers = pd.to_numeric(values, errors="coerce")
+            if kind == "int":
+                # A decimal in an int column is unparsed like any other bad value, so the column
+                # always keeps its declared type (the Parquet schema relies on it)
+                converted = numbers.where(numbers % 1 == 0).astype("Int64")
+            else:
+                converted = numbers.astype("float64")
+        else:
+            converted = values
+
+        if kind in ("datetime", "int", "float"):
+            unparsed = int(converted.isna().sum() - values.isna().sum())
+            if unparsed and keep_unparsed:
+                logger.warning(f"Column {column} has {unparsed} values that are not {kind}, keeping it as text")
+                converted = values
+            elif unparsed:
+                logger.warning(f"Column {column} has {unparsed} values that are not {kind}, they become empty")
+        df[column] = converted
+    return df
+
+
+def schema_drift(report_name, columns):
+    """Columns a report has gained and lost against its schema, as (added, dropped). Unknown reports have no drift"""
+    schema = get_schema(report_name)
+    if not schema or not len(columns):
+        return [], []
+    added = [column for column in columns if column not in schema]
+    dropped = [column for column in schema if column not in columns]
+    if added:
+        logger.warning(f"Schema drift in {report_name}: new columns {added}, kept as text until added to REPORT_SCHEMAS")
+    if dropped:
+        logger.warning(f"Schema drift in {report_name}: columns no longer returned {dropped}")
+    return added, dropped
+
+
+def type_report_frame(report_name, df):
+    """Apply a report's schema to a DataFrame built from its raw rows, checking for schema drift.
+
+    Returns (typed DataFrame, memory before, memory after) with memory in bytes, counting string contents.
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    schema_drift(report_name, list(df.columns))
+    df = apply_schema(df, get_schema(report_name), keep_unparsed=True)
+    memory_after = int(df.memory_usage(deep=True).sum())
+    logger.info(
+        f"{report_name}: {len(df)} rows use {memory_before / 1024 / 1024:.1f} MB untyped, "
+        f"{memory_after / 1024 / 1024:.1f} MB typed"
+    )
+    return df, memory_before, memory_after
+
+
+def arrow_schema(columns, schema):
+    """pyarrow schema for the given columns, so every chunk of a report is written with the same types"""
+    import pyarrow as pa
+
+    arrow_types = {
+        "datetime": pa.timestamp("ms"),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+    }
+    return pa.schema([(column, arrow_types[schema.get(column, "string")]) for column in columns])
+
+
+def write_parquet_from_csv(csv_path, parquet_path, schema, chunksize=50000, compression="snappy"):
+    """Convert a report CSV to a typed Parquet file, one chunk of rows at a time. Returns the row count"""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    row_count = 0
+    try:
+        try:
+            chunks = pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunksize)
+            for chunk in chunks:
+                apply_schema(chunk, schema)
+                if writer is None:
+                    target_schema = arrow_schema(list(chunk.columns), schema)
+                    writer = pq.ParquetWriter(parquet_path, target_schema, compression=compression)
+                table = pa.Table.from_pandas(chunk, schema=target_schema, preserve_index=False)
+                writer.write_table(table)
+                row_count += len(chunk)
+        except pd.errors.EmptyDataError:
+            pass
+        if writer is None:
+            # Empty report: still write a valid file
+            writer = pq.ParquetWriter(parquet_path, pa.schema([]), compression=compression)
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from veracore_client import STATE_FOLDER
+
+DEFAULT_TIMINGS_PATH = os.path.join(STATE_FOLDER, "report_timings.jsonl")
+
+# Stage fields reported by the summary CLI, in pipeline order
+STAGES = [
+    "token_seconds",
+    "start_seconds",
+    "created_seconds",
+    "processing_seconds",
+    "partition_seconds",
+    "download_seconds",
+    "parse_seconds",
+    "dataframe_seconds",
+    "schema_seconds",
+    "csv_write_seconds",
+    "merge_seconds",
+    "fingerprint_seconds",
+    "parquet_write_seconds",
+    "upload_seconds",
+    "total_seconds",
+]
+SIZES = ["payload_bytes", "rows", "untyped_bytes", "typed_bytes"]
+
+
+class ReportTimer:
+    """Collects per-stage timings for one report in one run"""
+
+    def __init__(self, report_name, run_id=None, token_seconds=None):
+        self._started = time.perf_counter()
+        self._status = None
+        self._status_since = None
+        self.record = {
+            "run_id": run_id,
+            "report": report_name,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "token_seconds": token_seconds,
+            "success": False,
+        }
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block and add it to `<name>_seconds`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(f"{name}_seconds", time.perf_counter() - start)
+
+    def add(self, key, value):
+        self.record[key] = (self.record.get(key) or 0) + value
+
+    def set(self, key, value):
+        self.record[key] = value
+
+    def task_started(self):
+        """Mark the moment the task was accepted; it sits in Created until a poll says otherwise"""
+        self._status = "Created"
+        self._status_since = time.perf_counter()
+
+    def observe_status(self, status):
+        """Attribute the time since the last observation to the status the task was in"""
+        now = time.perf_counter()
+        if self._status is not None:
+            key = f"{self._status.lower().replace(' ', '_')}_seconds"
+            self.add(key, now - self._status_since)
+        self._status = status
+        self._status_since = now
+
+    def finish(self, success):
+        self.record["success"] = bool(success)
+        self.record["total_seconds"] = time.perf_counter() - self._started
+        return self.record
+
+
+class TimingStore:
+    """Append-only JSONL file of report timing records"""
+
+    def __init__(self, path=DEFAULT_TIMINGS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as timings_file:
+                timings_file.write(json.dumps(record) + "\n")
+
+    def load(self):
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as timings_file:
+            for line in timings_file:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = (len(ordered) - 1) * pct / 100
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def summarize(records, recent_runs=5, regression_factor=1.5):
+    """Per report and stage: count, p50/p90/p95/max, and the recent-vs-baseline trend"""
+    by_report = {}
+    for record in records:
+        if record.get("success"):
+            by_report.setdefault(record["report"], []).append(record)
+
+    summary = {}
+    for report_name, report_records in sorted(by_report.items()):
+        report_records.sort(key=lambda r: r.get("timestamp", ""))
+        stages = {}
+        for field in STAGES + SIZES:
+            values = [r[field] for r in report_records if r.get(field) is not None]
+            if not values:
+                continue
+            recent = values[-recent_runs:]
+            baseline = values[:-recent_runs]
+            recent_mean = sum(recent) / len(recent)
+            baseline_mean = sum(baseline) / len(baseline) if baseline else None
+            trend = recent_mean / baseline_mean if baseline_mean else None
+            stages[field] = {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p95": percentile(values, 95),
+                "max": max(values),
+                "trend": trend,
+                "regression": trend is not None and trend >= regression_factor,
+            }
+        summary[report_name] = stages
+    return summary
+
+
+def print_summary(summary):
+    for report_name, stages in summary.items():
+        print("=" * 80)
+        print(report_name)
+        print("=" * 80)
+        print(f"{'stage':<22}{'n':>5}{'p50':>12}{'p90':>12}{'p95':>12}{'max':>12}{'trend':>10}")
+        for field, stats in stages.items():
+            trend = f"{stats['trend']:.2f}x" if stats["trend"] is not None else "-"
+            flag = "  <-- REGRESSION" if stats["regression"] else ""
+            print(
+                f"{field:<22}{stats['count']:>5}{stats['p50']:>12.2f}{stats['p90']:>12.2f}"
+                f"{stats['p95']:>12.2f}{stats['max']:>12.2f}{trend:>10}{flag}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize report timings recorded by reports.py")
+    parser.add_argument("--path", default=DEFAULT_TIMINGS_PATH, help="Timing history file")
+    parser.add_argument("--report", help="Only show this report")
+    parser.add_argument("--recent", type=int, default=5,
+                        help="Number of most recent runs compared against the earlier baseline")
+    parser.add_argument("--regression-factor", type=float, default=1.5,
+                        help="Flag stages whose recent mean is this many times the baseline mean")
+    args = parser.parse_args()
+
+    records = TimingStore(args.path).load()
+    if args.report:
+        records = [r for r in records if r["report"] == args.report]
+    if not records:
+        print(f"No timing records found in {args.path}")
+        return 1
+
+    summary = summarize(records, args.recent, args.regression_factor)
+    print_summary(summary)
+    regressions = [
+        f"{report_name}.{field}"
+        for report_name, stages in summary.items()
+        for field, stats in stages.items()
+        if stats["regression"]
+    ]
+    if regressions:
+        print(f"\nRegressions: {', '.join(regressions)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,43 @@
-import requests
-from dotenv import set_key, load_dotenv
+from dotenv import load_dotenv
 import os
-import pandas as pd
-import numpy as np
 import time
 import logging
 import sys
-from datetime import datetime
-from office365.sharepoint.client_context import ClientContext
-from office365.runtime.auth.client_credential import ClientCredential
-from office365.runtime.auth.authentication_context import AuthenticationContext
+import argparse
+import signal
+import threading
+import math
+import json
+from veracore_client import VeraCoreClient, TokenManager, STATE_FOLDER
+from sharepoint_uploader import SharePointUploader
+from json_stream import iter_json_array, write_rows_to_csv
+from polling import make_polling_strategy, ReportDurationHistory
+from report_timings import ReportTimer, TimingStore
+from incremental import IncrementalPull, HighWaterMarks
+from fingerprint import fingerprint_csv, FingerprintCache
+from catalog import ReportCatalog
+from manifest import load_manifest, ScheduleState, DEFAULT_MANIFEST_PATH
+from run_status import RunStatus
+from checkpoint import RunJournal
+from retry import RetryPolicy
+from sharepoint_archive import archive_uploads
+from pipeline import Pipeline, Completed
+from payload_store import PayloadStore
+from inventory_metrics import compute_inventory_metrics, load_report_csv, write_metric_tables, UNITS_REPORT, LOCATIONS_REPORT
+from rollups import (RollupStore, ROLLUP_SOURCES, OWNER_SOURCES, PICK_SLIP_SOURCES,
+                     product_owner_map, pick_slip_owner_map, prepare_source, unassigned_share)
+from partitioning import date_range_filters, split_range, describe_range, combine_partitions, count_undated_rows
+from report_schemas import get_schema, write_parquet_from_csv, type_report_frame, schema_drift, DATE_FORMAT
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-pd.set_option("display.max_rows", None)
-pd.set_option("display.max_columns", None)
-pd.set_option("display.width", 0)
-pd.set_option("display.max_colwidth", None)
-
 CSV_FOLDER = os.path.join(os.getcwd(), "csvs")
 ARCHIVE_FOLDER = os.path.join(os.getcwd(), "archive")
-OUTPUT_FOLDER = os.path.join(os.getcwd(), f"output_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-os.makedirs(CSV_FOLDER, exist_ok=True)
-os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+DATASET_FOLDER = os.path.join(os.getcwd(), "datasets")
+# Set for each run by init_run(), which also creates the folders
+RUN_TIMESTAMP = None
+OUTPUT_FOLDER = None
 
 dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(dotenv_path)
@@ -39,6 +54,123 @@ SHAREPOINT_CLIENT_ID = os.getenv("SHAREPOINT_CLIENT_ID")
 SHAREPOINT_CLIENT_SECRET = os.getenv("SHAREPOINT_CLIENT_SECRET")
 SHAREPOINT_TENANT_ID = os.getenv("SHAREPOINT_TENANT_ID")
 
+# Report status polling. "adaptive" backs off with jitter and learns each report's usual duration,
+# "fixed" polls every STATUS_POLL_INTERVAL seconds up to STATUS_MAX_ATTEMPTS times. A report's manifest
+# timeout replaces the deadline of either strategy
+POLLING_STRATEGY = os.getenv("POLLING_STRATEGY", "adaptive")
+POLL_DEADLINE_SECONDS = float(os.getenv("POLL_DEADLINE_SECONDS", "600"))
+STATUS_POLL_INTERVAL = 3
+STATUS_MAX_ATTEMPTS = 20
+
+# Cap on report tasks in flight at once when running concurrently
+MAX_CONCURRENT_REPORTS = int(os.getenv("MAX_CONCURRENT_REPORTS", "4"))
+
+# Stream report payloads straight to CSV instead of loading them whole
+STREAM_REPORTS = os.getenv("STREAM_REPORTS", "false").lower() == "true"
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "5000"))
+
+# Convert each downloaded report to the column types in report_schemas.py (dates, categoricals,
+# numbers) before writing it, logging its memory before and after and any columns VeraCore added
+# or dropped. The CSV text is unchanged. Streamed reports are only checked for drift
+TYPED_REPORTS = os.getenv("TYPED_REPORTS", "true").lower() == "true"
+
+# Pull only rows newer than each report's high-water mark and merge them into a local full dataset.
+# Applies to reports that declare an "incremental" date field and natural key
+INCREMENTAL_MODE = os.getenv("INCREMENTAL_REPORTS", "false").lower() == "true"
+INCREMENTAL_LOOKBACK_HOURS = float(os.getenv("INCREMENTAL_LOOKBACK_HOURS", "24"))
+
+# Skip uploading a report whose rows are identical to the last uploaded version
+SKIP_UNCHANGED_UPLOADS = os.getenv("SKIP_UNCHANGED_UPLOADS", "true").lower() == "true"
+
+# Output format uploaded to SharePoint: "csv", "parquet" (typed, compressed) or "both"
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "csv").lower()
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "snappy")
+
+# Reports to pull, with per-report frequency, filters, output name, timeout and priority
+REPORT_MANIFEST_PATH = os.getenv("REPORT_MANIFEST", DEFAULT_MANIFEST_PATH)
+SCHEDULE_GRACE_MINUTES = float(os.getenv("SCHEDULE_GRACE_MINUTES", "2"))
+
+# Retries for transient VeraCore and SharePoint failures (5xx, 429, timeouts, dropped connections).
+# RETRY_BUDGET caps the total number of retries in one run
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+RETRY_BUDGET = int(os.getenv("RETRY_BUDGET", "50"))
+
+# Reports with a "partition" config are split into date-range sub-tasks when VeraCore answers
+# "Request too Large", or up front when their last row count exceeds the config's max_rows
+PARTITION_PARTS = int(os.getenv("PARTITION_PARTS", "4"))
+PARTITION_MAX_PARTS = int(os.getenv("PARTITION_MAX_PARTS", "16"))
+PARTITION_MAX_PARALLEL = int(os.getenv("PARTITION_MAX_PARALLEL", "4"))
+PARTITION_MAX_DEPTH = int(os.getenv("PARTITION_MAX_DEPTH", "3"))
+
+# Finished report tasks go through download -> transform -> upload worker pools connected by queues of
+# PIPELINE_QUEUE_SIZE, so one report's upload overlaps the next one's download. With PIPELINE_STAGES
+# on, sequential mode also hands each finished task to the pipeline and moves on to the next report.
+# SharePoint calls share one client context, so more than one upload worker gains nothing
+PIPELINE_STAGES = os.getenv("PIPELINE_STAGES", "true").lower() == "true"
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+PIPELINE_TRANSFORM_WORKERS = int(os.getenv("PIPELINE_TRANSFORM_WORKERS", "2"))
+PIPELINE_UPLOAD_WORKERS = int(os.getenv("PIPELINE_UPLOAD_WORKERS", "1"))
+
+# Keep each task's raw report payload (gzipped, content-addressed) so --replay can rebuild outputs
+# without calling VeraCore. The store is trimmed to PAYLOAD_STORE_MAX_MB and PAYLOAD_STORE_MAX_AGE_DAYS
+CAPTURE_PAYLOADS = os.getenv("CAPTURE_PAYLOADS", "false").lower() == "true"
+PAYLOAD_STORE_MAX_MB = float(os.getenv("PAYLOAD_STORE_MAX_MB", "2048"))
+PAYLOAD_STORE_MAX_AGE_DAYS = float(os.getenv("PAYLOAD_STORE_MAX_AGE_DAYS", "14"))
+
+# After a run that refreshed unit-details or WarehouseLocations, inventory-health tables (aging by owner,
+# on hand per owner, dormant units, zone occupancy) are computed from the latest copies of both and uploaded.
+# A unit is dormant after DORMANT_DAYS on hand with nothing marked for picking
+INVENTORY_METRICS = os.getenv("INVENTORY_METRICS", "true").lower() == "true"
+DORMANT_DAYS = int(os.getenv("DORMANT_DAYS", "180"))
+
+# After a run that refreshed the Shipping Report, exceptions or pickslip_activity, daily rollups per product
+# owner are rebuilt for the (owner, day) partitions whose input rows changed and uploaded under
+# SHAREPOINT_ROLLUP_FOLDER/owner=<owner>/date=<YYYY-MM-DD>/. Off by default: the current reports resolve
+# an owner for few shipping rows. Nothing is published while more than ROLLUP_MAX_UNASSIGNED of the rows
+# have no owner
+ROLLUPS = os.getenv("ROLLUPS", "false").lower() == "true"
+ROLLUP_MAX_UNASSIGNED = float(os.getenv("ROLLUP_MAX_UNASSIGNED", "0.5"))
+SHAREPOINT_ROLLUP_FOLDER = os.getenv("SHAREPOINT_ROLLUP_FOLDER", "Rollups")
+
+# Daemon mode: longest sleep between schedule checks; the manifest is re-read on every check
+DAEMON_TICK_SECONDS = float(os.getenv("DAEMON_TICK_SECONDS", "60"))
+
+# Re-fetch the VeraCore report catalog once the cached copy is older than this
+CATALOG_TTL_HOURS = float(os.getenv("CATALOG_TTL_HOURS", "24"))
+REFRESH_CATALOG = False
+
+# After each run, older uploads in the SharePoint folder are moved to dated subfolders of
+# SHAREPOINT_ARCHIVE_FOLDER, keeping the newest ARCHIVE_KEEP_LAST files of each report live
+SHAREPOINT_ARCHIVE_FOLDER = os.getenv("SHAREPOINT_ARCHIVE_FOLDER", "Archive")
+ARCHIVE_KEEP_LAST = int(os.getenv("ARCHIVE_KEEP_LAST", "1"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "100"))
+
+# Files above this size (MB) are uploaded to SharePoint in chunks of SHAREPOINT_CHUNK_SIZE_MB
+SHAREPOINT_CHUNKED_UPLOAD_THRESHOLD_MB = float(os.getenv("SHAREPOINT_CHUNKED_UPLOAD_THRESHOLD_MB", "4"))
+SHAREPOINT_CHUNK_SIZE_MB = float(os.getenv("SHAREPOINT_CHUNK_SIZE_MB", "2"))
+
+# One authenticated SharePoint session per run, created on first use
+_sharepoint_uploader = None
+_duration_history = None
+_timing_store = None
+_high_water_marks = None
+_fingerprint_cache = None
+_report_catalog = None
+_schedule_state = None
+_run_status = None
+_run_journal = None
+_retry_policy = None
+_payload_store = None
+_rollup_store = None
+# VeraCore tasks open at once across the run, partition sub-tasks included; set by main()
+_task_slots = None
+_token_seconds = None
+_logging_configured = False
+
+logger = logging.getLogger(__name__)
+
 #Set up logging
 def setup_logging():
     log_dir = 'logs'
@@ -70,184 +202,94 @@ def setup_logging():
     logger.info(f"Logging initialized. Log file: {log_file}")
     return logger
 
-logger = setup_logging()
 
+def init_run():
+    """Start a run: configure logging and pandas once, then stamp the run and create its folders.
 
+    Nothing here happens at import time, so importing this module for a helper has no side effects.
+    """
+    global _logging_configured, RUN_TIMESTAMP, OUTPUT_FOLDER
+    if not _logging_configured:
+        setup_logging()
+        import pandas as pd
+        pd.set_option("display.max_rows", None)
+        pd.set_option("display.max_columns", None)
+        pd.set_option("display.width", 0)
+        pd.set_option("display.max_colwidth", None)
+        _logging_configured = True
 
-def archive_sharepoint_csvs():
-    """Separate function to archive existing CSVs before uploading new ones"""
+    RUN_TIMESTAMP = datetime.now().strftime('%Y%m%d_%H%M%S')
+    OUTPUT_FOLDER = os.path.join(os.getcwd(), f"output_{RUN_TIMESTAMP}")
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    os.makedirs(CSV_FOLDER, exist_ok=True)
+    os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
+    os.makedirs(STATE_FOLDER, exist_ok=True)
+
+
+
+def archive_sharepoint_csvs(reports=None, extra_outputs=()):
+    """Move older uploads of the given reports (default: all) and extra output names into dated Archive
+    subfolders in SharePoint, keeping the newest ARCHIVE_KEEP_LAST of each in the live folder"""
     try:
         logger.info("=" * 50)
-        logger.info("ARCHIVING EXISTING CSV FILES")
+        logger.info("ARCHIVING OLDER SHAREPOINT UPLOADS")
         logger.info("=" * 50)
-        
-        # Log environment variables
-        logger.info(f"ARCHIVE: SHAREPOINT_URL = {SHAREPOINT_URL}")
-        logger.info(f"ARCHIVE: SHAREPOINT_FOLDER = {SHAREPOINT_FOLDER}")
-        logger.info(f"ARCHIVE: SHAREPOINT_CLIENT_ID = {'SET' if SHAREPOINT_CLIENT_ID else 'NOT SET'}")
-        logger.info(f"ARCHIVE: SHAREPOINT_CLIENT_SECRET = {'SET' if SHAREPOINT_CLIENT_SECRET else 'NOT SET'}")
-        
-        # Connect to SharePoint
-        credentials = ClientCredential(SHAREPOINT_CLIENT_ID, SHAREPOINT_CLIENT_SECRET)
-        ctx = ClientContext(SHAREPOINT_URL).with_credentials(credentials)
-        
-        # Archive existing CSV files
-        success = archive_existing_csvs(ctx, SHAREPOINT_FOLDER)
-        
-        if success:
-            logger.info("=" * 50)
-            logger.info("ARCHIVING COMPLETED SUCCESSFULLY")
-            logger.info("=" * 50)
-        else:
-            logger.warning("=" * 50)
-            logger.warning("ARCHIVING HAD ISSUES")
-            logger.warning("=" * 50)
-        
-        return success
-    
+        output_names = None
+        if reports is not None:
+            output_names = {Path(report["output_csv"]).stem for report in reports} | set(extra_outputs)
+        summary = archive_uploads(
+            get_sharepoint_uploader(),
+            archive_folder=SHAREPOINT_ARCHIVE_FOLDER,
+            keep_last=ARCHIVE_KEEP_LAST,
+            reports=output_names,
+            batch_size=ARCHIVE_BATCH_SIZE
+        )
+        return summary["failed"] == 0
+
     except Exception as e:
         logger.error(f"Error during archiving: {e}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         return False
 
-# Just add these debug lines to your existing archive_existing_csvs function
-def archive_existing_csvs(ctx, relative_folder_url):
-    """Archive all CSV files in the SharePoint folder to an Archive subfolder, grouped by timestamp"""
-    try:
-        logger.info(f"ARCHIVE: Starting archive process for folder: {relative_folder_url}")
-        
-        # Verify web access
-        ctx.load(ctx.web)
-        ctx.execute_query()
-        logger.info(f"ARCHIVE: Connected to site: {ctx.web.properties['Title']}")
-        
-        # Load the target folder
-        target_folder = ctx.web.get_folder_by_server_relative_url(relative_folder_url)
-        ctx.load(target_folder)
-        ctx.load(target_folder.files)
-        
-        # ALSO load folders to see subfolders
-        ctx.load(target_folder.folders)
-        
-        ctx.execute_query()
-        
-        logger.info(f"ARCHIVE: Folder exists: {target_folder.exists}")
-        logger.info(f"ARCHIVE: Folder ServerRelativeUrl: {target_folder.serverRelativeUrl}")
-        
-        # Check for subfolders
-        logger.info(f"ARCHIVE: Number of subfolders: {len(target_folder.folders)}")
-        for subfolder in target_folder.folders:
-            logger.info(f"ARCHIVE: Subfolder found: {subfolder.properties.get('Name', 'Unknown')}")
-        
-        # Detailed file logging
-        logger.info(f"ARCHIVE: Files collection type: {type(target_folder.files)}")
-        logger.info(f"ARCHIVE: Files collection length: {len(target_folder.files)}")
-        
-        # Try to iterate through files with detailed logging
-        all_files = []
-        try:
-            for idx, f in enumerate(target_folder.files):
-                # Force load each file's properties
-                ctx.load(f)
-                ctx.execute_query()
-                
-                file_info = {
-                    'Index': idx,
-                    'Name': f.properties.get("Name", "Unknown"),
-                    'ServerRelativeUrl': f.properties.get("ServerRelativeUrl", "Unknown"),
-                    'Length': f.properties.get("Length", 0),
-                    'TimeLastModified': f.properties.get("TimeLastModified", "Unknown")
-                }
-                all_files.append(file_info)
-                logger.info(f"ARCHIVE: File {idx}: {file_info}")
-        except Exception as file_enum_error:
-            logger.error(f"ARCHIVE: Error enumerating files: {file_enum_error}")
-            import traceback
-            logger.error(f"ARCHIVE: Traceback: {traceback.format_exc()}")
-        
-        logger.info(f"ARCHIVE: Total files enumerated: {len(all_files)}")
-        
-        # Alternative method: Try using list items
-        logger.info("ARCHIVE: Attempting alternative method using list items...")
-        try:
-            # Get the parent list/library
-            list_title = "Documents"  # Default document library name
-            doc_library = ctx.web.lists.get_by_title(list_title)
-            
-            # Query for items in the specific folder
-            from office365.sharepoint.caml_query import CamlQuery
-            caml = CamlQuery()
-            caml.folder_server_relative_url = relative_folder_url
-            
-            items = doc_library.get_items(caml)
-            ctx.load(items)
-            ctx.execute_query()
-            
-            logger.info(f"ARCHIVE: List items found: {len(items)}")
-            for item in items:
-                logger.info(f"ARCHIVE: List item: {item.properties}")
-                
-        except Exception as list_error:
-            logger.error(f"ARCHIVE: List method failed: {list_error}")
-        
-        # Filter CSV files
-        csv_files = [f for f in target_folder.files if f.properties["Name"].lower().endswith(".csv")]
-        
-        if not csv_files:
-            logger.info(f"ARCHIVE: No CSV files to archive")
-            return True
-            
-        logger.info(f"ARCHIVE: Found {len(csv_files)} CSV files to archive")
-        
-        # ... rest of your existing archiving code ...
-        
-    except Exception as e:
-        logger.error(f"ARCHIVE: Critical error: {e}")
-        import traceback
-        logger.error(f"ARCHIVE: Traceback: {traceback.format_exc()}")
-        return False
 
+# Upload function with SharePoint path handling
+def get_retry_policy():
+    global _retry_policy
+    if _retry_policy is None:
+        _retry_policy = RetryPolicy(
+            max_attempts=RETRY_MAX_ATTEMPTS,
+            base_delay=RETRY_BASE_DELAY,
+            max_delay=RETRY_MAX_DELAY,
+            budget=RETRY_BUDGET
+        )
+    return _retry_policy
 
 
+def get_sharepoint_uploader():
+    """Returns the shared SharePoint uploader, authenticating on first use"""
+    global _sharepoint_uploader
+    if _sharepoint_uploader is None:
+        _sharepoint_uploader = SharePointUploader(
+            SHAREPOINT_URL,
+            SHAREPOINT_FOLDER,
+            SHAREPOINT_CLIENT_ID,
+            SHAREPOINT_CLIENT_SECRET,
+            chunked_upload_threshold=int(SHAREPOINT_CHUNKED_UPLOAD_THRESHOLD_MB * 1024 * 1024),
+            chunk_size=int(SHAREPOINT_CHUNK_SIZE_MB * 1024 * 1024),
+            retry_policy=get_retry_policy()
+        )
+    return _sharepoint_uploader
 
-# Upload function with SharePoint path handling
-def upload_to_sharepoint(local_file_path, sharepoint_filename):
-    try:
-        logger.info(f"Starting SharePoint upload process...")
-        logger.info(f"Local file: {local_file_path}")
-        logger.info(f"SharePoint filename: {sharepoint_filename}")
-
-        # Connect to SharePoint
-        credentials = ClientCredential(SHAREPOINT_CLIENT_ID, SHAREPOINT_CLIENT_SECRET)
-        ctx = ClientContext(SHAREPOINT_URL).with_credentials(credentials)
-        logger.info("SharePoint Client Credential authentication successful")
-
-        # Get target folder for upload
-        target_folder = ctx.web.get_folder_by_server_relative_url(SHAREPOINT_FOLDER)
-        ctx.load(target_folder)
-        ctx.execute_query()
-        
-        # Upload the new file
-        logger.info(f"Uploading file: {sharepoint_filename}")
-        with open(local_file_path, "rb") as content_file:
-            file_content = content_file.read()
-            target_folder.upload_file(sharepoint_filename, file_content)
-            ctx.execute_query()
-
-        logger.info(f"Successfully uploaded: {sharepoint_filename}")
-        logger.info(f"SharePoint URL: {SHAREPOINT_URL}{SHAREPOINT_FOLDER}/{sharepoint_filename}")
-        return True
 
-    except Exception as e:
-        logger.error(f"Error uploading to SharePoint: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return False
+def upload_to_sharepoint(local_file_path, sharepoint_filename):
+    logger.info(f"Starting SharePoint upload process...")
+    logger.info(f"Local file: {local_file_path}")
+    logger.info(f"SharePoint filename: {sharepoint_filename}")
+    return get_sharepoint_uploader().upload(local_file_path, sharepoint_filename)
     
 # Get authorization token from VeraCore API
-def get_token():
+def get_token(client):
     logger.info("Attempting to get authorization token from VeraCore API")
     logger.info(f"USERNAME: {'SET' if USERNAME else 'NOT SET'}")
     logger.info(f"PASSWORD: {'SET' if PASSWORD else 'NOT SET'}")  
@@ -257,50 +299,17 @@ def get_token():
         logger.info(f"USERNAME value: {USERNAME}")
     if SYSTEM_ID:
         logger.info(f"SYSTEM_ID value: {SYSTEM_ID}")
-    if TOKEN:
-        logger.info("Attempting direct token authentication...")
-        auth_header = {"Authorization": f"bearer {TOKEN}"}
-
-    # Test the token with a simple API call
-
-    test_url = "https://wms.3plwinner.com/VeraCore/Public.Api/api/reports"
 
     try:
-        logger.info(f"Testing direct token against: {test_url}")
-        test_response = requests.get(test_url, headers=auth_header, timeout=30)
-        logger.info(f"Direct token test - Status Code: {test_response.status_code}")
-        logger.info(f"Direct token test - Response Headers: {dict(test_response.headers)}")
-            
-        if test_response.status_code == 200:
-            logger.info("✓ Direct token authentication successful!")
-            return auth_header
-        else:
-            logger.warning(f"✗ Direct token failed - Response: {test_response.text[:500]}")
-    except Exception as e:
-        logger.warning(f"✗ Direct token test error: {str(e)}")
-
-
-
-
-    endpoint = 'https://wms.3plwinner.com/VeraCore/Public.Api/api/Login'
-
-    body = {
-        "userName" : USERNAME,
-        "password" : PASSWORD,
-        "systemId" : SYSTEM_ID
-    }
-    try:
-        response = requests.post(endpoint, data=body, timeout=120)
-        if response.status_code != 200:
-            logger.error("Login Failed:", response.status_code, response.text)
-            return None
-        
-        token = response.json()["Token"]
-
-        auth_header = {
-            "Authorization" : "bearer "+ token
-        }
-
+        token_manager = TokenManager(
+            client,
+            USERNAME,
+            PASSWORD,
+            SYSTEM_ID,
+            cache_path=os.path.join(STATE_FOLDER, "veracore_token.json"),
+            seed_token=TOKEN
+        )
+        auth_header = token_manager.get_auth_header()
         logger.info("Authentication Successful.")
         return auth_header
     except Exception as e:
@@ -308,15 +317,13 @@ def get_token():
         return None
 
 
-def start_report_task(report_name, filters, auth_header):
-    url = "https://wms.3plwinner.com/VeraCore/Public.Api/api/reports"
-
+def start_report_task(report_name, filters, client):
     payload = {
         "reportName": report_name,
         "filters": filters
     }
     try:
-        response = requests.post(url, json=payload, headers=auth_header, timeout=30)
+        response = client.post("reports", endpoint="start", json=payload)
         if response.status_code == 200:
             response_data = response.json()
             task_id = response_data["TaskId"]
@@ -330,115 +337,849 @@ def start_report_task(report_name, filters, auth_header):
         return None
     
 
-def run_report_task(report_name, filters, auth_header, output_csv_name):
-    logger.info(f"Processing report: {report_name}")
-    task_id = start_report_task(report_name, filters, auth_header)
-    if not task_id:
-        print("Failed to start report task.")
-        return False
-    
-    status_url = f"https://wms.3plwinner.com/VeraCore/Public.Api/api/reports/{task_id}/status"
-    max_attempts = 20
-    for attempt in range(max_attempts):
-        try:
-            status_response = requests.get(status_url, headers=auth_header, timeout=90)
-            if status_response.status_code == 200:
-                status = status_response.json().get("Status")
-                if status == "Done":
-                    logger.info(f"Report Completed")
-                    break
-                elif status == "Request too Large":
-                    logger.error("Report Request too large: %s %s", status_response.status_code, status_response.text)
-                    return False
-                else:
-                    if attempt % 5 == 0:
-                        logger.info(f"Report status: {status} (attempt {attempt + 1})")
-                    time.sleep(3)
-            else:
-                logger.error(f"Status Check Failed: {status_response.status_code} {status_response.text}")
-                return False
-                time.sleep(3)
-        except Exception as e:
-            logger.error(f"Exception checking report status: {str(e)}")
+def check_report_status(task_id, client):
+    """Returns the current status string for a report task, or None if the check failed"""
+    try:
+        status_response = client.get(f"reports/{task_id}/status", endpoint="status")
+        if status_response.status_code == 200:
+            status = status_response.json().get("Status")
+            if status == "Request too Large":
+                logger.warning(f"Report task {task_id} is too large for VeraCore to run in one piece")
+            return status
+        else:
+            logger.error(f"Status Check Failed: {status_response.status_code} {status_response.text}")
+            return None
+    except Exception as e:
+        logger.error(f"Exception checking report status: {str(e)}")
+        return None
+
+
+def download_and_upload_report(report_name, task_id, client, output_csv_name, timer=None, incremental_pull=None):
+    """Downloads a finished report task, saves it as CSV and uploads it to SharePoint"""
+    timer = timer or new_report_timer(report_name)
+    try:
+        output_path = os.path.join(OUTPUT_FOLDER, output_csv_name)
+        if not download_report(report_name, task_id, client, output_path, timer, incremental_pull=incremental_pull):
             return False
+        logger.info(f"Report data saved to {output_csv_name}")
+        return deliver_report(report_name, output_path, output_csv_name, timer, incremental_pull)
+
+    except Exception as e:
+        logger.error(f"Exception getting report data for {report_name}: {str(e)}")
+        return False
+
+
+def download_report(report_name, task_id, client, output_path, timer, partition=None, incremental_pull=None):
+    """Fetches the data of a finished report task into a CSV at output_path. Returns True on success"""
+    success, payload = fetch_report(report_name, task_id, client, output_path, timer, partition, incremental_pull)
+    if success and payload is not None:
+        write_report_csv(report_name, payload, output_path, timer)
+    return success
+
+
+def fetch_report(report_name, task_id, client, output_path, timer, partition=None, incremental_pull=None):
+    """Network half of download_report. Returns (success, payload).
+
+    With STREAM_REPORTS the rows are parsed off the socket straight into output_path and payload is
+    None; otherwise payload is the raw JSON body for write_report_csv. With CAPTURE_PAYLOADS the raw
+    body is also kept in the payload store; `partition` labels a date-range sub-task's payload and
+    `incremental_pull` marks a delta pull's payload as holding only the rows since its mark.
+    """
+    capture = capture_payload(report_name, task_id, partition, incremental_pull)
+    success = False
+    try:
+        if STREAM_REPORTS:
+            with timer.stage("download"):
+                report_response = client.get(f"reports/{task_id}", endpoint="data", stream=True)
+                if report_response.status_code == 200:
+                    # Parse Data items off the socket and write them in batches
+                    chunks = report_response.iter_content(chunk_size=64 * 1024)
+                    rows = iter_json_array(count_payload_bytes(chunks, timer, capture), "Data")
+                    row_count = write_rows_to_csv(rows, output_path, STREAM_BATCH_SIZE)
+                    timer.set("rows", row_count)
+                    logger.info(f"Streamed {row_count} rows")
+                    schema_drift(report_name, read_csv_header(output_path))
+            payload = None
+        else:
+            with timer.stage("download"):
+                report_response = client.get(f"reports/{task_id}", endpoint="data")
+                payload = report_response.content
+            timer.set("payload_bytes", len(payload))
+            if capture is not None and report_response.status_code == 200:
+                capture.write(payload)
+
+        if report_response.status_code != 200:
+            logger.error("Error retrieving report data for %s: %s %s", report_name, report_response.status_code, report_response.text)
+            return False, None
+        success = True
+        return True, payload
+    finally:
+        finish_capture(capture, success)
+
+
+def capture_payload(report_name, task_id, partition=None, incremental_pull=None):
+    """Payload store writer for a task's raw data when CAPTURE_PAYLOADS is on, else None"""
+    if not CAPTURE_PAYLOADS:
+        return None
+    fields = {"partition": partition} if partition else {}
+    if incremental_pull and incremental_pull.is_delta:
+        fields.update(is_delta=True, since=incremental_pull.since.isoformat(timespec="seconds"))
+    try:
+        return get_payload_store().writer(RUN_TIMESTAMP, report_name, task_id, **fields)
+    except Exception as e:
+        logger.warning(f"Could not capture raw payload for {report_name}: {e}")
+        return None
+
+
+def finish_capture(capture, success):
+    """Keep a completely downloaded payload in the store, drop anything else"""
+    if capture is None:
+        return
+    try:
+        if success:
+            digest = capture.commit()
+            logger.info(f"Raw payload kept in the payload store ({digest[:12]})")
+        else:
+            capture.discard()
+    except Exception as e:
+        logger.warning(f"Could not store raw payload: {e}")
+
+
+def write_report_csv(report_name, payload, output_path, timer):
+    """CPU half of download_report: parses a raw report payload, types it and writes its rows as CSV"""
+    with timer.stage("parse"):
+        report_data = json.loads(payload)["Data"]
+    with timer.stage("dataframe"):
+        import pandas as pd
+        df = pd.DataFrame(report_data)
+        del report_data
+    timer.set("rows", len(df))
+    if TYPED_REPORTS:
+        with timer.stage("schema"):
+            df, memory_before, memory_after = type_report_frame(report_name, df)
+        timer.set("untyped_bytes", memory_before)
+        timer.set("typed_bytes", memory_after)
+    with timer.stage("csv_write"):
+        df.to_csv(output_path, index=False, date_format=DATE_FORMAT)
+
+
+def read_csv_header(path):
+    """Column names of a CSV file"""
+    import csv
+
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        return next(csv.reader(csv_file), [])
+
+
+def deliver_report(report_name, output_path, output_csv_name, timer, incremental_pull=None):
+    """Merges, fingerprints and converts a downloaded report CSV, then uploads it to SharePoint"""
+    prepared = prepare_report_upload(report_name, output_path, output_csv_name, timer, incremental_pull)
+    if prepared is None:
+        return True
+    uploads, fingerprint = prepared
+    return upload_report_files(report_name, output_csv_name, uploads, timer, incremental_pull, fingerprint)
+
+
+def prepare_report_upload(report_name, output_path, output_csv_name, timer, incremental_pull=None):
+    """Merges, fingerprints and converts a downloaded report CSV.
+
+    Returns (uploads, fingerprint) for upload_report_files, or None when the content is unchanged
+    since the last upload and there is nothing to send.
+    """
+    if incremental_pull:
+        with timer.stage("merge"):
+            timer.set("rows", incremental_pull.merge(output_path))
+
+    # Skip the upload when the content matches what was uploaded last time
+    digest = None
+    if SKIP_UNCHANGED_UPLOADS:
+        with timer.stage("fingerprint"):
+            digest, fingerprint_rows = fingerprint_csv(output_path)
+        if get_fingerprint_cache().matches(report_name, digest, output_formats()):
+            last_file = get_fingerprint_cache().last_upload(report_name)
+            logger.info(f"Report {report_name} unchanged since last upload ({last_file}), skipping upload")
+            timer.set("unchanged", True)
+            if incremental_pull:
+                incremental_pull.commit()
+            return None
+
+    uploads = build_uploads(report_name, output_path, output_csv_name, timer)
+
+    fingerprint = [digest, fingerprint_rows] if digest else None
+    new_mark = incremental_pull.new_mark if incremental_pull else None
+    checkpoint(
+        report_name,
+        "downloaded",
+        uploads=uploads,
+        fingerprint=fingerprint,
+        incremental_mark=new_mark.isoformat() if new_mark else None
+    )
+    return uploads, fingerprint
+
+
+def build_uploads(report_name, output_path, output_csv_name, timer):
+    """(local path, SharePoint filename) pairs for the configured output formats, writing Parquet if needed"""
+    basename = Path(output_csv_name).stem
+    timestamped_basename = f"{basename}_{datetime.now().strftime("%Y%m%d_%H%M%S")}"
+    timestamped_filename = f"{timestamped_basename}.csv"
+
+    uploads = []
+    if OUTPUT_FORMAT in ("csv", "both"):
+        uploads.append((output_path, timestamped_filename))
+    if OUTPUT_FORMAT in ("parquet", "both"):
+        with timer.stage("parquet_write"):
+            parquet_path = write_parquet_output(report_name, output_path)
+        uploads.append((parquet_path, f"{timestamped_basename}.parquet"))
+    return uploads
+
+
+def upload_report_files(report_name, output_csv_name, uploads, timer, incremental_pull=None, fingerprint=None):
+    """Uploads a report's files, then advances its high-water mark and fingerprint once they are delivered"""
+    with timer.stage("upload"):
+        upload_success = all([upload_to_sharepoint(path, filename) for path, filename in uploads])
+    if os.path.exists(output_csv_name):
+        os.remove(output_csv_name)
+        logger.info(f"Cleaned up local file")
+    if upload_success:
+        logger.info(f"Successfully uploaded {output_csv_name} to SharePoint")
+        if incremental_pull:
+            incremental_pull.commit()
+        if fingerprint:
+            digest, fingerprint_rows = fingerprint
+            formats = output_formats(filename for _, filename in uploads)
+            get_fingerprint_cache().update(report_name, digest, fingerprint_rows, uploads[0][1], formats)
+        return True
     else:
-        logger.error("Report timeout - did not complete within 90 seconds")
+        logger.error(f"Failed to upload {output_csv_name} to SharePoint")
         return False
-    
+
+
+def output_formats(filenames=None):
+    """Formats key for the fingerprint cache, e.g. "csv+parquet": of the given upload filenames, else of OUTPUT_FORMAT"""
+    if filenames is None:
+        formats = {"csv", "parquet"} if OUTPUT_FORMAT == "both" else {OUTPUT_FORMAT}
+    else:
+        formats = {os.path.splitext(filename)[1].lstrip(".") for filename in filenames}
+    return "+".join(sorted(formats))
+
+
+def write_parquet_output(report_name, output_path):
+    """Writes a typed Parquet copy of the report CSV next to it and returns its path"""
+    parquet_path = f"{os.path.splitext(output_path)[0]}.parquet"
+    row_count = write_parquet_from_csv(output_path, parquet_path, get_schema(report_name), compression=PARQUET_COMPRESSION)
+    logger.info(f"Parquet output saved to {os.path.basename(parquet_path)} ({row_count} rows, {os.path.getsize(parquet_path)} bytes)")
+    return parquet_path
+
+
+def count_payload_bytes(chunks, timer, capture=None):
+    """Pass byte chunks through while adding their size to the timer's payload_bytes (and copying them to capture)"""
+    for chunk in chunks:
+        timer.add("payload_bytes", len(chunk))
+        if capture is not None:
+            capture.write(chunk)
+        yield chunk
+
+
+def get_timing_store():
+    global _timing_store
+    if _timing_store is None:
+        _timing_store = TimingStore(os.path.join(STATE_FOLDER, "report_timings.jsonl"))
+    return _timing_store
+
+
+def new_report_timer(report_name):
+    return ReportTimer(report_name, run_id=RUN_TIMESTAMP, token_seconds=_token_seconds)
+
+
+def record_report_timing(timer, success):
+    """Append the report's timing record to the local timing history"""
     try:
-        report_url = f"https://wms.3plwinner.com/VeraCore/Public.Api/api/reports/{task_id}"
-        report_response = requests.get(report_url, headers=auth_header, timeout=90)
-        if report_response.status_code == 200:
-            report_data = report_response.json()["Data"]
-            df = pd.DataFrame(report_data)
-            output_path = os.path.join(OUTPUT_FOLDER, output_csv_name)
-            df.to_csv(output_path, index=False)
-            logger.info(f"Report data saved to {output_csv_name}")
-            basename = Path(output_csv_name).stem
-            timestamped_filename = f"{basename}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"
-
-
-            upload_success = upload_to_sharepoint(output_path, timestamped_filename)
-            if os.path.exists(output_csv_name):
-                os.remove(output_csv_name)
-                logger.info(f"Cleaned up local file")
-            if upload_success:
-                logger.info(f"Successfully uploaded {output_csv_name} to SharePoint")
-                return True
+        get_timing_store().append(timer.finish(success))
+    except Exception as e:
+        logger.warning(f"Could not record report timings: {e}")
+
+
+def get_fingerprint_cache():
+    global _fingerprint_cache
+    if _fingerprint_cache is None:
+        _fingerprint_cache = FingerprintCache(os.path.join(STATE_FOLDER, "fingerprints.json"))
+    return _fingerprint_cache
+
+
+def get_report_catalog():
+    global _report_catalog
+    if _report_catalog is None:
+        _report_catalog = ReportCatalog(
+            os.path.join(STATE_FOLDER, "report_catalog.json"),
+            ttl=timedelta(hours=CATALOG_TTL_HOURS)
+        )
+    return _report_catalog
+
+
+def get_run_status(mode="once"):
+    global _run_status
+    if _run_status is None:
+        _run_status = RunStatus(os.path.join(STATE_FOLDER, "status.json"), mode=mode)
+    return _run_status
+
+
+def checkpoint(report_name, stage, **fields):
+    """Records a report's progress in the run journal, if this run keeps one"""
+    if _run_journal is None:
+        return
+    try:
+        _run_journal.record(report_name, stage, **fields)
+    except Exception as e:
+        logger.warning(f"Could not update run journal for {report_name}: {e}")
+
+
+def prepare_resumed_reports(reports, client, report_results):
+    """Decides how each unfinished report of a resumed run continues.
+
+    Reports whose files were already downloaded are re-uploaded here without refetching, and their
+    results added to report_results. Reports with a task that VeraCore still knows about get
+    "resume_task_id" so they are polled instead of resubmitted. The rest are returned unchanged.
+    """
+    remaining = []
+    for report in reports:
+        report_name = report["report_name"]
+        entry = _run_journal.entry(report_name)
+        uploads = entry.get("uploads")
+        if uploads and all(os.path.exists(path) for path, _ in uploads):
+            report_results[report_name] = reupload_report(report, entry)
+            continue
+        task_id = entry.get("task_id")
+        if task_id:
+            status = check_report_status(task_id, client)
+            if status and status != "Request too Large":
+                report = dict(report, resume_task_id=task_id)
             else:
-                logger.error(f"Failed to upload {output_csv_name} to SharePoint")
-                return False
+                logger.warning(f"Task {task_id} for {report_name} cannot be resumed, submitting a new task")
+        remaining.append(report)
+    return remaining
 
-        else:
-            logger.error("Error retrieving report data: %s %s", report_response.status_code, report_response.text)
+
+def reupload_report(report, entry):
+    """Uploads the files a previous run downloaded for this report"""
+    report_name = report["report_name"]
+    timer = new_report_timer(report_name)
+    success = False
+    try:
+        logger.info(f"Resuming {report_name}: re-uploading downloaded files without refetching")
+        incremental_pull = None
+        if entry.get("incremental_mark"):
+            incremental_pull = get_incremental_pull(report_name, report["output_csv"], report.get("incremental"))
+            if incremental_pull:
+                incremental_pull.new_mark = datetime.fromisoformat(entry["incremental_mark"])
+        success = upload_report_files(
+            report_name,
+            report["output_csv"],
+            entry["uploads"],
+            timer,
+            incremental_pull,
+            entry.get("fingerprint")
+        )
+        return success
+    finally:
+        record_report_timing(timer, success)
+        checkpoint(report_name, "uploaded" if success else "failed")
+
+
+def get_task_slots():
+    """Semaphore bounding the VeraCore tasks open at once; main() sizes it for the run"""
+    global _task_slots
+    if _task_slots is None:
+        _task_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REPORTS)
+    return _task_slots
+
+
+def get_payload_store():
+    global _payload_store
+    if _payload_store is None:
+        _payload_store = PayloadStore(
+            os.path.join(STATE_FOLDER, "payloads"),
+            max_bytes=int(PAYLOAD_STORE_MAX_MB * 1024 * 1024),
+            max_age=timedelta(days=PAYLOAD_STORE_MAX_AGE_DAYS)
+        )
+    return _payload_store
+
+
+def get_schedule_state():
+    global _schedule_state
+    if _schedule_state is None:
+        _schedule_state = ScheduleState(
+            os.path.join(STATE_FOLDER, "schedule.json"),
+            grace=timedelta(minutes=SCHEDULE_GRACE_MINUTES)
+        )
+    return _schedule_state
+
+
+def validate_report_names(reports, client):
+    """Split reports into those found in the VeraCore catalog and those that are not.
+
+    Unknown names fail before a task is submitted. If the catalog cannot be loaded, every report is kept.
+    """
+    catalog = get_report_catalog()
+    if catalog.load(client, force=REFRESH_CATALOG) is None:
+        logger.warning("Report catalog unavailable, skipping report name validation")
+        return reports, []
+    missing = catalog.validate([report["report_name"] for report in reports])
+    for name, suggestion in missing.items():
+        hint = f" (did you mean '{suggestion}'?)" if suggestion else ""
+        logger.error(f"Report '{name}' is not in the VeraCore report catalog{hint}")
+    valid = [report for report in reports if report["report_name"] not in missing]
+    invalid = [report for report in reports if report["report_name"] in missing]
+    return valid, invalid
+
+
+def get_incremental_pull(report_name, output_csv_name, incremental):
+    """Returns an IncrementalPull for the report when incremental mode is on and the report supports it"""
+    global _high_water_marks
+    if not (INCREMENTAL_MODE and incremental):
+        return None
+    if _high_water_marks is None:
+        _high_water_marks = HighWaterMarks(os.path.join(STATE_FOLDER, "high_water_marks.json"))
+    return IncrementalPull(
+        report_name,
+        incremental,
+        os.path.join(DATASET_FOLDER, output_csv_name),
+        _high_water_marks,
+        lookback=timedelta(hours=INCREMENTAL_LOOKBACK_HOURS)
+    )
+
+
+def get_duration_history():
+    """Returns the learned report durations used to time the first status poll"""
+    global _duration_history
+    if _duration_history is None:
+        _duration_history = ReportDurationHistory(os.path.join(STATE_FOLDER, "report_durations.json"))
+    return _duration_history
+
+
+def get_polling_strategy(report_name, timeout=None):
+    """Returns the configured polling strategy for a report, seeded with its learned duration"""
+    return make_polling_strategy(
+        POLLING_STRATEGY,
+        expected_duration=get_duration_history().expected(report_name),
+        deadline=POLL_DEADLINE_SECONDS,
+        interval=STATUS_POLL_INTERVAL,
+        max_attempts=STATUS_MAX_ATTEMPTS,
+        timeout=timeout
+    )
+
+
+def run_report_task(report_name, filters, client, output_csv_name, timeout=None, incremental=None, task_id=None,
+                    partition=None):
+    """Runs one report end to end. With task_id (from --resume), polls that task instead of starting a new one"""
+    timer = new_report_timer(report_name)
+    success = False
+    try:
+        success = _run_report_task(report_name, filters, client, output_csv_name, timeout, incremental, timer, task_id, partition)
+        return success
+    finally:
+        record_report_timing(timer, success)
+        get_run_status().report_finished(report_name, success)
+        checkpoint(report_name, "uploaded" if success else "failed")
+
+
+def _run_report_task(report_name, filters, client, output_csv_name, timeout, incremental, timer, task_id=None,
+                     partition=None):
+    logger.info(f"Processing report: {report_name}")
+    incremental_pull = get_incremental_pull(report_name, output_csv_name, incremental)
+    if incremental_pull:
+        filters = incremental_pull.apply_filters(filters)
+    parts = planned_partitions(report_name, partition, incremental_pull)
+    if parts > 1 and not task_id:
+        return run_partitioned_report(report_name, filters, client, output_csv_name, partition, parts, timer, timeout, incremental_pull)
+    if task_id:
+        logger.info(f"Resuming report task {task_id} for {report_name}")
+    else:
+        with timer.stage("start"):
+            task_id = start_report_task(report_name, filters, client)
+        if not task_id:
+            print("Failed to start report task.")
             return False
+        checkpoint(report_name, "started", task_id=task_id)
+    timer.task_started()
+    get_run_status().report_update(report_name, "processing", task_id)
 
-    except Exception as e:
-        logger.error(f"Exception getting report data: {str(e)}")
+    status = wait_for_report_task(report_name, task_id, client, timer, timeout)
+    if status == "Request too Large" and partition:
+        parts = partition.get("parts", PARTITION_PARTS)
+        logger.warning(f"{report_name} is too large for one task, splitting it into {parts} date ranges")
+        return run_partitioned_report(report_name, filters, client, output_csv_name, partition, parts, timer, timeout, incremental_pull)
+    if status != "Done":
         return False
+    get_run_status().report_update(report_name, "downloading")
+    checkpoint(report_name, "done")
 
-# Get data from APi endpoint
-def get_dataframe_from_api(endpoint, auth_header, name):
+    return download_and_upload_report(report_name, task_id, client, output_csv_name, timer, incremental_pull)
+
+
+def wait_for_report_task(report_name, task_id, client, timer, timeout=None, record_duration=True):
+    """Polls a report task until it finishes. Returns "Done", "Request too Large", "Timeout" or None on failure"""
+    strategy = get_polling_strategy(report_name, timeout)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        elapsed = time.monotonic() - started
+        if strategy.expired(attempt, elapsed):
+            logger.error(f"Report timeout - did not complete within {strategy.deadline:.0f} seconds")
+            return "Timeout"
+        time.sleep(strategy.next_delay(attempt, elapsed))
+        status = check_report_status(task_id, client)
+        timer.observe_status(status)
+        attempt += 1
+        if status == "Done":
+            logger.info(f"Report Completed")
+            if record_duration:
+                get_duration_history().record(report_name, time.monotonic() - started)
+            return status
+        elif status is None or status == "Request too Large":
+            return status
+        elif attempt % 5 == 1:
+            logger.info(f"Report status: {status} (attempt {attempt})")
+
+
+def planned_partitions(report_name, partition, incremental_pull=None):
+    """Number of date-range sub-tasks to split a full pull into up front, based on its last row count"""
+    if not partition or not partition.get("max_rows") or (incremental_pull and incremental_pull.is_delta):
+        return 1
+    last_rows = last_row_count(report_name)
+    if not last_rows:
+        return 1
+    return min(math.ceil(last_rows / partition["max_rows"]), PARTITION_MAX_PARTS)
+
+
+def last_row_count(report_name):
+    """Row count of the report's most recent successful run, from the timing history"""
     try:
-        logger.info(f"Fetching data from API endpoint: {endpoint}")
-        response = requests.get(endpoint, headers=auth_header)
+        for record in reversed(get_timing_store().load()):
+            if record["report"] == report_name and record.get("success") and record.get("rows"):
+                return record["rows"]
+    except Exception as e:
+        logger.warning(f"Could not read timing history: {e}")
+    return None
 
-        if response.status_code == 200:
-            data = response.json()
-            if isinstance(data, list) and all(isinstance(item, dict) for item in data):
-                df = pd.DataFrame(data)
-                filename = f"{name}.csv"
-                output_path = os.path.join(OUTPUT_FOLDER, filename)
-                df.to_csv(output_path, index=False)
-
-                if name == "available_reports_endpoint":
-                    logger.info(f"Skipping SharePoint upload for {filename}")
-                    if os.path.exists(output_path):
-                        os.remove(output_path)
-                        logger.info(f"Deleted local file: {output_path}")
-                    return True
-                
-                upload_success = upload_to_sharepoint(output_path, filename)
-                if os.path.exists(filename):
-                    os.remove(filename)
-                if upload_success:
-                    logger.info(f"Successfully uploaded {filename} to SharePoint")
-                    return True
-                else:
-                    logger.error(f"Failed to upload {filename} to SharePoint")
-                    return False
-            else:
-                logger.error(f"Unexpected data format: {name}")
-                return False
-        else:
-            logger.error(f"API Error for {name}: {response.status_code}")
+
+def run_partitioned_report(report_name, filters, client, output_csv_name, partition, parts, timer, timeout=None,
+                           incremental_pull=None):
+    """Runs the report as date-range sub-tasks in parallel and delivers the combined result as one file.
+
+    Rows with an empty date field match no range. They are fetched by one more sub-task when the
+    partition config has empty_date_filters (the VeraCore filters selecting them); otherwise each
+    run warns that they are missing.
+    """
+    ranges = split_range(None, None, parts, datetime.strptime(partition["start"], "%Y-%m-%d"))
+    output_path = os.path.join(OUTPUT_FOLDER, output_csv_name)
+    # A delta pull filters on its date field already, so it never has undated rows to fetch
+    is_delta = bool(incremental_pull and incremental_pull.is_delta)
+    fetch_undated = bool(partition.get("empty_date_filters")) and not is_delta
+    if not partition.get("empty_date_filters") and not is_delta:
+        warn_undated_rows(report_name, partition["date_field"])
+    part_paths = []
+    with timer.stage("partition"):
+        with ThreadPoolExecutor(max_workers=min(len(ranges) + fetch_undated, PARTITION_MAX_PARALLEL)) as executor:
+            futures = [
+                executor.submit(run_partition, report_name, filters, client, partition, start, end,
+                                f"{output_path}.part{i}", timeout, PARTITION_MAX_DEPTH, incremental_pull)
+                for i, (start, end) in enumerate(ranges)
+            ]
+            if fetch_undated:
+                futures.append(executor.submit(
+                    run_partition, report_name, list(filters) + partition["empty_date_filters"], client, partition,
+                    None, None, f"{output_path}.undated", timeout, 0, incremental_pull,
+                    f"empty {partition['date_field']}"
+                ))
+            results = [future.result() for future in futures]
+        if any(paths is None for paths in results):
+            logger.error(f"One or more partitions of {report_name} failed")
+            if CAPTURE_PAYLOADS:
+                # Replaying only some of the partitions would rebuild a partial report
+                get_payload_store().remove_entries(RUN_TIMESTAMP, report_name)
             return False
+        for paths in results:
+            part_paths.extend(paths)
+        row_count = combine_partitions(part_paths, output_path)
+    timer.set("rows", row_count)
+    logger.info(f"Combined {len(part_paths)} partitions of {report_name} into {output_csv_name} ({row_count} rows)")
+    return deliver_report(report_name, output_path, output_csv_name, timer, incremental_pull)
+
+
+def warn_undated_rows(report_name, date_field):
+    """Warn that a partitioned pull leaves out rows with an empty date field, counting them in the last output"""
+    previous = latest_report_output(report_name)
+    undated = count_undated_rows(previous, date_field) if previous else None
+    counted = f"; the last output ({previous}) had {undated} such rows" if undated is not None else ""
+    logger.warning(
+        f"Partitioned pull of {report_name} does not fetch rows with an empty {date_field}{counted}. "
+        f"Set empty_date_filters in its partition config to fetch them"
+    )
+
+
+def run_partition(report_name, filters, client, partition, start, end, part_path, timeout, depth, incremental_pull=None,
+                  label=None):
+    """Runs one date-range sub-task into part_path, splitting it in two again if it is still too large.
+
+    label replaces the date range in logs and payload captures (for the empty-date sub-task).
+    Returns the list of CSV paths written, or None if the partition failed.
+    """
+    range_label = label or describe_range(start, end)
+    label = f"{report_name} {range_label}"
+    part_timer = ReportTimer(label)
+    try:
+        # Each sub-task takes one of the run's task slots while it is open on VeraCore
+        with get_task_slots():
+            task_id = start_report_task(report_name, list(filters) + date_range_filters(partition["date_field"], start, end), client)
+            if not task_id:
+                return None
+            part_timer.task_started()
+            status = wait_for_report_task(report_name, task_id, client, part_timer, timeout, record_duration=False)
+            if status == "Done":
+                if not download_report(report_name, task_id, client, part_path, part_timer, range_label, incremental_pull):
+                    return None
+                logger.info(f"Partition {label} downloaded")
+                return [part_path]
+        if status == "Request too Large" and depth > 0:
+            logger.warning(f"Partition {label} is still too large, splitting it in two")
+            floor = datetime.strptime(partition["start"], "%Y-%m-%d")
+            paths = []
+            for i, (sub_start, sub_end) in enumerate(split_range(start, end, 2, floor)):
+                sub_paths = run_partition(report_name, filters, client, partition, sub_start, sub_end,
+                                          f"{part_path}.{i}", timeout, depth - 1, incremental_pull)
+                if sub_paths is None:
+                    return None
+                paths.extend(sub_paths)
+            return paths
+        logger.error(f"Partition {label} failed with status {status}")
+        return None
     except Exception as e:
-        logger.error(f"Exception fetching data from {name}: {str(e)}")
-        return False
+        logger.error(f"Exception running partition {label}: {str(e)}")
+        return None
+
+
+def run_reports_concurrently(reports, client, max_concurrent=MAX_CONCURRENT_REPORTS):
+    """Submits report tasks up front, polls them together and downloads each one as soon as it is Done.
+
+    Each VeraCore task holds one of the run's task slots (get_task_slots) while it is started,
+    processing or downloading; the sub-tasks of a partitioned report take slots of their own, so no
+    more than the slot count is open on VeraCore at any time. Finished tasks go through the
+    download/transform/upload pipeline, and a report that has moved on to transform or upload no
+    longer holds a slot. Each task is polled on its own schedule from the configured polling strategy.
+    Returns a dict of report name -> success.
+    """
+    logger.info(f"Running {len(reports)} reports concurrently (max {max_concurrent} in flight)")
+    pending = list(reports)
+    in_flight = {}
+    downloads = {}
+    results = {}
+    status_written = 0
+    slots = get_task_slots()
+
+    def finish(report, timer, success):
+        results[report["report_name"]] = success
+        record_report_timing(timer, success)
+        get_run_status().report_finished(report["report_name"], success)
+        checkpoint(report["report_name"], "uploaded" if success else "failed")
+
+    with new_report_pipeline(max_concurrent) as pipeline, ThreadPoolExecutor(max_workers=max_concurrent) as executor:
+        while pending or in_flight or downloads:
+            # Submit new tasks until the cap is reached
+            while pending and slots.acquire(blocking=False):
+                report = pending.pop(0)
+                logger.info(f"Submitting report: {report['report_name']}")
+                timer = new_report_timer(report["report_name"])
+                incremental_pull = get_incremental_pull(report["report_name"], report["output_csv"], report.get("incremental"))
+                filters = incremental_pull.apply_filters(report["filters"]) if incremental_pull else report["filters"]
+                task_id = report.get("resume_task_id")
+                parts = planned_partitions(report["report_name"], report.get("partition"), incremental_pull)
+                if parts > 1 and not task_id:
+                    # The sub-tasks take their own slots
+                    slots.release()
+                    future = executor.submit(
+                        run_partitioned_report,
+                        report["report_name"],
+                        filters,
+                        client,
+                        report["output_csv"],
+                        report["partition"],
+                        parts,
+                        timer,
+                        report.get("timeout"),
+                        incremental_pull
+                    )
+                    downloads[future] = (report, timer)
+                    continue
+                if task_id:
+                    logger.info(f"Resuming report task {task_id} for {report['report_name']}")
+                else:
+                    with timer.stage("start"):
+                        task_id = start_report_task(report["report_name"], filters, client)
+                    if not task_id:
+                        logger.error(f"Failed to start report task: {report['report_name']}")
+                        slots.release()
+                        finish(report, timer, False)
+                        continue
+                    checkpoint(report["report_name"], "started", task_id=task_id)
+                timer.task_started()
+                get_run_status().report_update(report["report_name"], "processing", task_id)
+                strategy = get_polling_strategy(report["report_name"], report.get("timeout"))
+                started = time.monotonic()
+                in_flight[task_id] = {
+                    "report": report,
+                    "timer": timer,
+                    "incremental_pull": incremental_pull,
+                    "filters": filters,
+                    "strategy": strategy,
+                    "started": started,
+                    "attempts": 0,
+                    "next_poll": started + strategy.next_delay(0, 0)
+                }
+
+            # Poll the tasks that are due
+            for task_id, entry in list(in_flight.items()):
+                if entry["next_poll"] > time.monotonic():
+                    continue
+                report = entry["report"]
+                timer = entry["timer"]
+                status = check_report_status(task_id, client)
+                timer.observe_status(status)
+                entry["attempts"] += 1
+                elapsed = time.monotonic() - entry["started"]
+                if status == "Done":
+                    logger.info(f"Report Completed: {report['report_name']} (Task ID: {task_id})")
+                    get_duration_history().record(report["report_name"], elapsed)
+                    get_run_status().report_update(report["report_name"], "queued")
+                    checkpoint(report["report_name"], "done")
+                    del in_flight[task_id]
+                    future = pipeline.submit({
+                        "report_name": report["report_name"],
+                        "task_id": task_id,
+                        "client": client,
+                        "output_csv": report["output_csv"],
+                        "timer": timer,
+                        "incremental_pull": entry["incremental_pull"],
+                        "task_slot": True
+                    })
+                    downloads[future] = (report, timer)
+                elif status == "Request too Large" and report.get("partition"):
+                    parts = report["partition"].get("parts", PARTITION_PARTS)
+                    logger.warning(f"{report['report_name']} is too large for one task, splitting it into {parts} date ranges")
+                    del in_flight[task_id]
+                    slots.release()
+                    future = executor.submit(
+                        run_partitioned_report,
+                        report["report_name"],
+                        entry["filters"],
+                        client,
+                        report["output_csv"],
+                        report["partition"],
+                        parts,
+                        timer,
+                        report.get("timeout"),
+                        entry["incremental_pull"]
+                    )
+                    downloads[future] = (report, timer)
+                elif status is None or status == "Request too Large":
+                    del in_flight[task_id]
+                    slots.release()
+                    finish(report, timer, False)
+                elif entry["strategy"].expired(entry["attempts"], elapsed):
+                    logger.error(f"Report timeout - {report['report_name']} did not complete within {entry['strategy'].deadline:.0f} seconds")
+                    del in_flight[task_id]
+                    slots.release()
+                    finish(report, timer, False)
+                else:
+                    if entry["attempts"] % 5 == 1:
+                        logger.info(f"Report status: {report['report_name']} {status} (attempt {entry['attempts']})")
+                    entry["next_poll"] = time.monotonic() + entry["strategy"].next_delay(entry["attempts"], elapsed)
+
+            # Collect finished downloads/uploads
+            for future in [f for f in downloads if f.done()]:
+                report, timer = downloads.pop(future)
+                try:
+                    finish(report, timer, future.result())
+                except Exception as e:
+                    logger.error(f"Exception processing {report['report_name']}: {str(e)}")
+                    finish(report, timer, False)
+
+            if time.monotonic() - status_written >= 5:
+                get_run_status().set_state("running", pipeline=pipeline.stats())
+                status_written = time.monotonic()
+
+            # Sleep until the next poll is due, waking early to collect finished downloads
+            if in_flight or downloads:
+                wake_at = min((entry["next_poll"] for entry in in_flight.values()), default=time.monotonic() + 1)
+                delay = wake_at - time.monotonic()
+                if downloads:
+                    delay = min(delay, 0.5)
+                time.sleep(max(delay, 0))
+
+    get_run_status().set_state("running", pipeline=pipeline.log_stats())
+    return results
+
+
+def new_report_pipeline(download_workers):
+    """Download, transform and upload stages for finished report tasks, connected by bounded queues"""
+    return Pipeline([
+        ("download", pipeline_download, download_workers, PIPELINE_QUEUE_SIZE),
+        ("transform", pipeline_transform, PIPELINE_TRANSFORM_WORKERS, PIPELINE_QUEUE_SIZE),
+        ("upload", pipeline_upload, PIPELINE_UPLOAD_WORKERS, PIPELINE_QUEUE_SIZE),
+    ])
+
+
+def pipeline_download(job):
+    """Network stage: fetch the finished task's payload, then give back the task slot it held"""
+    get_run_status().report_update(job["report_name"], "downloading")
+    job["output_path"] = os.path.join(OUTPUT_FOLDER, job["output_csv"])
+    try:
+        success, job["payload"] = fetch_report(job["report_name"], job["task_id"], job["client"], job["output_path"], job["timer"],
+                                               incremental_pull=job["incremental_pull"])
+    finally:
+        if job.pop("task_slot", False):
+            get_task_slots().release()
+    if not success:
+        return Completed(False)
+    return job
 
 
-def main():
+def pipeline_transform(job):
+    """CPU stage: parse the payload to CSV, then merge, fingerprint and convert it"""
+    get_run_status().report_update(job["report_name"], "transforming")
+    payload = job.pop("payload")
+    if payload is not None:
+        write_report_csv(job["report_name"], payload, job["output_path"], job["timer"])
+    logger.info(f"Report data saved to {job['output_csv']}")
+    prepared = prepare_report_upload(job["report_name"], job["output_path"], job["output_csv"], job["timer"], job["incremental_pull"])
+    if prepared is None:
+        return Completed(True)
+    job["uploads"], job["fingerprint"] = prepared
+    return job
+
+
+def pipeline_upload(job):
+    """SharePoint stage: upload the report's files and commit its high-water mark and fingerprint"""
+    get_run_status().report_update(job["report_name"], "uploading")
+    return upload_report_files(
+        job["report_name"],
+        job["output_csv"],
+        job["uploads"],
+        job["timer"],
+        job["incremental_pull"],
+        job["fingerprint"]
+    )
+
+
+def main(concurrent=False, max_concurrent=MAX_CONCURRENT_REPORTS, due_only=False, client=None, resume=False):
+    """Run the manifest reports once. A client passed in (daemon mode) is reused and left open.
+
+    With resume, only the reports the last run did not finish are run, continuing from its checkpoint journal.
+    """
+    init_run()
+    get_retry_policy().reset()
+    if _sharepoint_uploader is not None:
+        _sharepoint_uploader.reset_stats()
+    run_started = datetime.now()
     logger.info("=" * 50)
     logger.info("Starting Veracore Data Pipeline")
     logger.info(f"Execution time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -449,8 +1190,7 @@ def main():
         "PASSWORD": PASSWORD,
         "SYSTEM_ID": SYSTEM_ID,
         "SharePoint Client ID": SHAREPOINT_CLIENT_ID,
-        "SharePoint Client Secret": SHAREPOINT_CLIENT_SECRET,
-        "W_TOKEN": TOKEN
+        "SharePoint Client Secret": SHAREPOINT_CLIENT_SECRET
     }
     missing_vars = [var for var, value in required_vars.items() if not value]
     if missing_vars:
@@ -459,98 +1199,480 @@ def main():
         return False
     logger.info("All required environment variables are set.")
 
+    try:
+        reports_to_run = load_manifest(REPORT_MANIFEST_PATH)
+    except Exception as e:
+        logger.error(f"Could not load report manifest {REPORT_MANIFEST_PATH}: {str(e)}")
+        return False
+    schedule = get_schedule_state()
 
-    archive_sharepoint_csvs()
+    global _run_journal
+    journal_path = os.path.join(STATE_FOLDER, "run_journal.json")
+    _run_journal = RunJournal.load(journal_path) if resume else None
+    if resume and _run_journal is None:
+        logger.warning("No run journal to resume, running normally")
+    resuming = _run_journal is not None
+    if resuming:
+        unfinished = _run_journal.unfinished_reports()
+        reports_to_run = [report for report in reports_to_run if report["report_name"] in unfinished]
+        logger.info(f"Resuming run {_run_journal.run_id}: {', '.join(unfinished) or 'nothing left to do'}")
+        if not reports_to_run:
+            return True
+    else:
+        if due_only:
+            reports_to_run = schedule.due_reports(reports_to_run, run_started)
+            logger.info(f"Reports due: {', '.join(r['report_name'] for r in reports_to_run) or 'none'}")
+            if not reports_to_run:
+                return True
+        _run_journal = RunJournal(journal_path, RUN_TIMESTAMP, [report["report_name"] for report in reports_to_run])
+
+    # Sequential mode keeps one VeraCore task open at a time, partition sub-tasks included
+    global _task_slots
+    max_concurrent = max(max_concurrent, 1)
+    task_slots = max_concurrent if concurrent else 1
+    _task_slots = threading.BoundedSemaphore(task_slots)
 
-    auth_header = get_token()
-    if auth_header:
-        print("Authorization header obtained successfully.")
+    owns_client = client is None
+    global _token_seconds
+    token_started = time.perf_counter()
+    if owns_client:
+        # One connection per task slot, plus one for the thread polling the tasks
+        client = VeraCoreClient(pool_size=task_slots + 1, retry_policy=get_retry_policy())
+        auth_header = get_token(client)
+        if auth_header:
+            print("Authorization header obtained successfully.")
+        else:
+            logger.error("Failed to obtain authorization header.")
+            return False
     else:
-        logger.error("Failed to obtain authorization header.")
-        return False
+        client.token_manager.ensure_fresh()
+    _token_seconds = time.perf_counter() - token_started
     
-    endpoints = {
-    "available_reports_endpoint": "https://wms.3plwinner.com/VeraCore/Public.Api/api/reports", # GETS available reports
-    }
+    total_reports = len(reports_to_run)
+    report_results = {}
+    run_status = get_run_status()
+    run_status.run_started([report["report_name"] for report in reports_to_run])
 
-    for name, url in endpoints.items():
-        get_dataframe_from_api(url, auth_header, name)
-
-
-    # List of reports to run
-    reports_to_run = [
-        {
-            "report_name": "unit-details",
-            "filters": [],
-            "output_csv": "unit_details_with_current_balance.csv"
-        },
-        {
-            "report_name": "returns-products",
-            "filters": [],
-            "output_csv": "returns.csv"
-        },
-        {
-            "report_name": "expectedd-all",
-            "filters": [],
-            "output_csv": "expected_arrivals.csv"
-        },
-        {
-            "report_name": "unit-billing",
-            "filters": [],
-            "output_csv": "unit_billing.csv"
-        },
-        {
-            "report_name": "WarehouseLocations",
-            "filters": [],
-            "output_csv": "warehouse_locations.csv"
-        },
-        {
-            "report_name": "Shipping Report",
-            "filters": [],
-            "output_csv": "shipping_report.csv"
-        },
-        {
-            "report_name": "Pull Manifest report",
-            "filters": [],
-            "output_csv": "pull_manifest_report.csv"
-        },
-        {
-            "report_name": "pickslip_activity",
-            "filters": [],
-            "output_csv": "pickslip_activity.csv"
-        },
-        {
-            "report_name": "exceptions",
-            "filters": [],
-            "output_csv": "pickslip_exceptions.csv"
-        }
-    ]
+    valid_reports, invalid_reports = validate_report_names(reports_to_run, client)
+    for report in invalid_reports:
+        report_results[report["report_name"]] = False
+        checkpoint(report["report_name"], "failed")
+    if resuming:
+        valid_reports = prepare_resumed_reports(valid_reports, client, report_results)
 
-    successful_reports = 0
-    total_reports = len(reports_to_run)
+    if concurrent:
+        report_results.update(run_reports_concurrently(valid_reports, client, max_concurrent))
+    elif PIPELINE_STAGES:
+        # One VeraCore task at a time, with each finished report's transform and upload overlapping the next
+        report_results.update(run_reports_concurrently(valid_reports, client, 1))
+    else:
+        for i, report in enumerate(valid_reports, 1):
+            logger.info(f"Processing report {i}/{len(valid_reports)}: {report['report_name']}")
+            report_results[report["report_name"]] = run_report_task(
+                report["report_name"],
+                report["filters"],
+                client,
+                report["output_csv"],
+                timeout=report.get("timeout"),
+                incremental=report.get("incremental"),
+                task_id=report.get("resume_task_id"),
+                partition=report.get("partition")
+            )
 
-    for i, report in enumerate(reports_to_run, 1):
-        logger.info(f"Processing report {i}/{total_reports}: {report['report_name']}")
-        success = run_report_task(
-            report["report_name"],
-            report["filters"],
-            auth_header,
-            report["output_csv"]
-        )
+    successful_reports = sum(1 for success in report_results.values() if success)
+    for report_name, success in report_results.items():
         if success:
-            successful_reports += 1
+            schedule.mark_run(report_name, run_started)
+        else:
+            schedule.mark_failed(report_name, run_started)
+    run_status.run_finished(report_results)
+
+    metric_outputs = []
+    if INVENTORY_METRICS and (report_results.get(UNITS_REPORT) or report_results.get(LOCATIONS_REPORT)):
+        metric_outputs = publish_inventory_metrics(as_of=run_started) or []
+
+    if ROLLUPS and any(report_results.get(report_name) for report_name in ROLLUP_SOURCES):
+        publish_rollups()
+
+    # Archive after uploading, so the live folder always holds each report's latest file. A resumed
+    # run leaves the folder alone, so the uploads the interrupted run already made stay in place
+    if any(report_results.values()) and not resuming:
+        archive_sharepoint_csvs(reports_to_run, metric_outputs)
+    if CAPTURE_PAYLOADS:
+        get_payload_store().evict()
 
     logger.info("=" * 50)
     logger.info(f"Pipeline Summary:")
+    for report in reports_to_run:
+        result = "OK" if report_results.get(report["report_name"]) else "FAILED"
+        logger.info(f"  {report['report_name']}: {result}")
     logger.info(f"Successful reports: {successful_reports} / {total_reports}")
+    client.log_connection_stats()
+    get_retry_policy().log_summary()
+    if owns_client:
+        client.close()
+    get_sharepoint_uploader().log_summary()
     logger.info(f"Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 50)
     return successful_reports == total_reports
 
 
+def latest_report_output(report_name):
+    """Newest local output CSV of a manifest report: this run's output folder if it ran, else an earlier one"""
+    try:
+        output_csv = {report["report_name"]: report["output_csv"] for report in load_manifest(REPORT_MANIFEST_PATH)}[report_name]
+    except Exception as e:
+        logger.error(f"Could not find the output file of {report_name} in the manifest: {e}")
+        return None
+    candidates = sorted(Path(os.getcwd()).glob(f"output_*/{output_csv}"), key=lambda path: path.parent.name, reverse=True)
+    return str(candidates[0]) if candidates else None
+
+
+def publish_inventory_metrics(as_of=None, upload=True):
+    """Compute the inventory-health tables into the output folder and upload them.
+
+    Returns the uploaded table names (for archiving), or None if they could not all be built and uploaded.
+    """
+    logger.info("=" * 50)
+    logger.info("INVENTORY METRICS")
+    logger.info("=" * 50)
+    units_path = latest_report_output(UNITS_REPORT)
+    locations_path = latest_report_output(LOCATIONS_REPORT)
+    if not units_path or not locations_path:
+        logger.warning(f"Inventory metrics need local outputs of both {UNITS_REPORT} and {LOCATIONS_REPORT}, skipping")
+        return None
+    try:
+        started = time.perf_counter()
+        units = load_report_csv(units_path, UNITS_REPORT)
+        locations = load_report_csv(locations_path, LOCATIONS_REPORT)
+        loaded = time.perf_counter()
+        tables = compute_inventory_metrics(units, locations, as_of or datetime.now(), DORMANT_DAYS)
+        paths = write_metric_tables(tables, OUTPUT_FOLDER)
+        logger.info(
+            f"Inventory metrics from {len(units)} units and {len(locations)} locations: "
+            f"load {loaded - started:.2f}s, compute and write {time.perf_counter() - loaded:.2f}s"
+        )
+        if not upload:
+            return []
+        uploaded = [name for name, path in paths.items() if upload_to_sharepoint(path, f"{name}_{RUN_TIMESTAMP}.csv")]
+        if len(uploaded) < len(paths):
+            logger.error(f"Uploaded {len(uploaded)} / {len(paths)} inventory metric tables")
+            return None
+        return uploaded
+    except Exception as e:
+        logger.error(f"Exception computing inventory metrics: {str(e)}")
+        return None
+
+
+def get_rollup_store():
+    global _rollup_store
+    if _rollup_store is None:
+        _rollup_store = RollupStore(os.path.join(DATASET_FOLDER, "rollups"), os.path.join(STATE_FOLDER, "rollup_partitions.json"))
+    return _rollup_store
+
+
+def read_latest_output(report_name):
+    """The newest local output of a manifest report as strings, or None if there is none"""
+    import pandas as pd
+
+    path = latest_report_output(report_name)
+    if path is None:
+        logger.warning(f"No local output of {report_name} for the rollups")
+        return None
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def publish_rollups(upload=True):
+    """Rebuild the daily per-owner rollup partitions whose input rows changed and upload them"""
+    logger.info("=" * 50)
+    logger.info("DAILY ROLLUPS")
+    logger.info("=" * 50)
+    try:
+        started = time.perf_counter()
+        frames = {
+            report_name: read_latest_output(report_name)
+            for report_name in set(ROLLUP_SOURCES) | set(OWNER_SOURCES) | set(PICK_SLIP_SOURCES)
+        }
+        product_owners = product_owner_map([frames[report_name] for report_name in OWNER_SOURCES])
+        pick_slip_owners = pick_slip_owner_map([frames[report_name] for report_name in PICK_SLIP_SOURCES], product_owners)
+        sources = {
+            report_name: prepare_source(frames[report_name], date_column, product_owners, pick_slip_owners)
+            if frames[report_name] is not None else None
+            for report_name, date_column in ROLLUP_SOURCES.items()
+        }
+        unassigned, total = unassigned_share(sources)
+        if total and unassigned / total > ROLLUP_MAX_UNASSIGNED:
+            logger.error(
+                f"Rollups: {unassigned} of {total} rows ({unassigned / total:.1%}) have no resolvable product owner, "
+                f"more than ROLLUP_MAX_UNASSIGNED ({ROLLUP_MAX_UNASSIGNED:.0%}); not publishing"
+            )
+            return False
+        store = get_rollup_store()
+        changed, removed = store.update(sources)
+        logger.info(f"Rollups computed in {time.perf_counter() - started:.2f}s")
+        if removed:
+            logger.info(f"Rollups: {len(removed)} partitions no longer have rows; their SharePoint copies are left in place")
+        if upload and changed and not upload_rollup_partitions(store, changed):
+            return False
+        store.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Exception building rollups: {str(e)}")
+        return False
+
+
+def upload_rollup_partitions(store, partitions):
+    """Create the partitions' SharePoint folders in batches, then upload their files. Returns True if all uploaded"""
+    uploader = get_sharepoint_uploader()
+    base_url = f"{SHAREPOINT_FOLDER}/{SHAREPOINT_ROLLUP_FOLDER}"
+    owner_urls = sorted({f"{base_url}/owner={key.split('/')[0]}" for key in partitions})
+    folder_urls = [base_url] + owner_urls + [f"{base_url}/owner={owner}/date={date}" for owner, date in (key.split("/") for key in partitions)]
+    for i in range(0, len(folder_urls), ARCHIVE_BATCH_SIZE):
+        uploader.ensure_folders(folder_urls[i:i + ARCHIVE_BATCH_SIZE])
+
+    uploaded = failed = 0
+    for key in partitions:
+        owner, date = key.split("/")
+        for table_name, path in store.partition_files(key):
+            if uploader.upload(path, f"{table_name}.csv", f"{base_url}/owner={owner}/date={date}"):
+                uploaded += 1
+            else:
+                failed += 1
+    logger.info(f"Rollups: uploaded {uploaded} files for {len(partitions)} partitions ({failed} failed)")
+    return failed == 0
+
+
+def replay_run(run_id="latest", upload=False):
+    """Rebuild the CSV/Parquet outputs of a captured run from the payload store, without calling VeraCore.
+
+    Outputs go to a new output folder and are only uploaded with upload=True. High-water marks,
+    fingerprints, the schedule and the run journal are left untouched.
+    """
+    init_run()
+    store = get_payload_store()
+    entries = store.entries(run_id)
+    if not entries:
+        logger.error(f"No captured payloads for run {run_id}. Captured runs: {', '.join(store.runs()) or 'none'}")
+        return False
+    logger.info("=" * 50)
+    logger.info(f"Replaying run {entries[0]['run_id']} from the payload store")
+    logger.info("=" * 50)
+
+    manifest = {}
+    try:
+        manifest = {report["report_name"]: report for report in load_manifest(REPORT_MANIFEST_PATH)}
+    except Exception as e:
+        logger.warning(f"Could not load the report manifest, using default output names: {e}")
+
+    by_report = {}
+    for entry in entries:
+        by_report.setdefault(entry["report"], []).append(entry)
+    started = time.perf_counter()
+    results = {
+        report_name: replay_report(report_name, report_entries, manifest.get(report_name), upload)
+        for report_name, report_entries in by_report.items()
+    }
+    logger.info(f"Replayed {sum(results.values())} / {len(results)} reports in {time.perf_counter() - started:.2f}s into {OUTPUT_FOLDER}")
+    if upload:
+        get_sharepoint_uploader().log_summary()
+    return all(results.values())
+
+
+def replay_report(report_name, entries, report=None, upload=False):
+    """Rebuild one report's outputs from its captured payloads. Partition payloads are combined again.
+
+    A payload captured by an incremental delta pull holds only the rows since its high-water mark. It is
+    rebuilt as <output>_delta.csv and never uploaded, since it would replace the full report in SharePoint.
+    """
+    started = time.perf_counter()
+    output_csv_name = report["output_csv"] if report else f"{report_name}.csv"
+    delta = any(entry.get("is_delta") for entry in entries)
+    if delta:
+        output_csv_name = f"{Path(output_csv_name).stem}_delta.csv"
+        since = min(entry["since"] for entry in entries if entry.get("is_delta"))
+        logger.warning(f"{report_name} was captured by an incremental pull and holds only rows since {since}")
+    output_path = os.path.join(OUTPUT_FOLDER, output_csv_name)
+    timer = new_report_timer(report_name)
+    store = get_payload_store()
+    try:
+        partitions = [entry for entry in entries if entry.get("partition")]
+        if partitions:
+            part_paths = []
+            for i, entry in enumerate(partitions):
+                part_path = f"{output_path}.part{i}"
+                write_report_csv(report_name, store.load(entry["digest"]), part_path, timer)
+                part_paths.append(part_path)
+            key = ((report or {}).get("partition") or {}).get("key")
+            timer.set("rows", combine_partitions(part_paths, output_path, key))
+        else:
+            # A report captured more than once in the run (e.g. retried) is rebuilt from the last capture
+            write_report_csv(report_name, store.load(entries[-1]["digest"]), output_path, timer)
+
+        uploads = build_uploads(report_name, output_path, output_csv_name, timer)
+        success = True
+        if upload and delta:
+            logger.error(f"Not uploading {report_name}: a delta capture would replace the full report in SharePoint")
+            success = False
+        elif upload:
+            success = all([upload_to_sharepoint(path, filename) for path, filename in uploads])
+        logger.info(f"Replayed {report_name}: {timer.record.get('rows')} rows in {time.perf_counter() - started:.2f}s")
+        return success
+    except Exception as e:
+        logger.error(f"Exception replaying {report_name}: {str(e)}")
+        return False
+
+
+def next_scheduled_run(reports, schedule):
+    """Earliest time any manifest report becomes due (now if one has never run)"""
+    now = datetime.now()
+    due_times = []
+    for report in reports:
+        next_due = schedule.next_due(report)
+        due_times.append(now if next_due is None else next_due - schedule.grace)
+    return max(min(due_times, default=now + timedelta(seconds=DAEMON_TICK_SECONDS)), now)
+
+
+def run_daemon(concurrent=False, max_concurrent=MAX_CONCURRENT_REPORTS):
+    """Stay resident and run the manifest reports as they fall due.
+
+    The VeraCore session, token and SharePoint session are created once and reused for every run.
+    SIGTERM or CTRL-C lets the current run finish and then exits; a second signal exits at once.
+    """
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        if stop.is_set():
+            logger.warning("Second stop signal received, exiting immediately")
+            raise KeyboardInterrupt
+        logger.info(f"Received signal {signum}, stopping after the current run")
+        stop.set()
+        get_run_status().set_state("stopping")
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    if hasattr(signal, "SIGBREAK"):
+        signal.signal(signal.SIGBREAK, request_stop)
+
+    init_run()
+    run_status = get_run_status(mode="daemon")
+    max_concurrent = max(max_concurrent, 1)
+    client = VeraCoreClient(pool_size=max_concurrent + 1, retry_policy=get_retry_policy())
+    if not get_token(client):
+        logger.error("Failed to obtain authorization header.")
+        run_status.set_state("stopped")
+        return False
+
+    logger.info(f"Daemon started (pid {os.getpid()}), checking the schedule at least every {DAEMON_TICK_SECONDS:.0f}s")
+    success = True
+    try:
+        while not stop.is_set():
+            try:
+                # Re-read every time so manifest edits apply without a restart
+                reports = load_manifest(REPORT_MANIFEST_PATH)
+                schedule = get_schedule_state()
+                if schedule.due_reports(reports):
+                    main(concurrent=concurrent, max_concurrent=max_concurrent, due_only=True, client=client)
+                next_run = next_scheduled_run(reports, schedule)
+            except Exception as e:
+                logger.error(f"Daemon run failed: {str(e)}")
+                run_status.set_state("idle", current_run=None, in_flight={})
+                next_run = datetime.now() + timedelta(seconds=DAEMON_TICK_SECONDS)
+
+            if stop.is_set():
+                break
+            if run_status.status.get("next_run") != next_run.isoformat(timespec="seconds"):
+                logger.info(f"Next report due at {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+            run_status.set_state("idle", next_run=next_run.isoformat(timespec="seconds"))
+            wait_seconds = min((next_run - datetime.now()).total_seconds(), DAEMON_TICK_SECONDS)
+            stop.wait(max(wait_seconds, 1))
+    except KeyboardInterrupt:
+        logger.warning("Daemon interrupted during a run")
+        success = False
+    finally:
+        client.close()
+        run_status.set_state("stopped", next_run=None)
+        logger.info("Daemon stopped")
+    return success
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Veracore Data Pipeline")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Submit all report tasks up front and poll them together")
+    parser.add_argument("--max-concurrent", type=positive_int, default=MAX_CONCURRENT_REPORTS,
+                        help="Maximum number of report tasks in flight when running concurrently")
+    parser.add_argument("--stream", action="store_true",
+                        help="Parse report payloads incrementally and write CSV in batches")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default=None,
+                        help="Output format to upload (default from OUTPUT_FORMAT, or csv)")
+    parser.add_argument("--force-upload", action="store_true",
+                        help="Upload every report even if its content has not changed since the last upload")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Pull only new rows for date-keyed reports and merge them into the local datasets")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident and run the manifest reports on their schedule with warm sessions")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retry only the reports the last run did not finish, reusing its task IDs and downloaded files")
+    parser.add_argument("--due-only", action="store_true",
+                        help="Run only the manifest reports whose frequency says they are due")
+    parser.add_argument("--refresh-catalog", action="store_true",
+                        help="Re-fetch the VeraCore report catalog even if the cached copy has not expired")
+    parser.add_argument("--capture-payloads", action="store_true",
+                        help="Keep each task's raw report payload in the local payload store for --replay")
+    parser.add_argument("--replay", metavar="RUN",
+                        help="Rebuild the outputs of a captured run (run timestamp or 'latest') without calling VeraCore")
+    parser.add_argument("--replay-upload", action="store_true",
+                        help="With --replay, also upload the rebuilt files to SharePoint")
+    parser.add_argument("--rollups", action="store_true",
+                        help="Only rebuild and upload the changed daily rollup partitions from the latest local report outputs")
+    parser.add_argument("--inventory-metrics", action="store_true",
+                        help="Only compute and upload the inventory-health tables from the latest local report outputs")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.stream:
+        STREAM_REPORTS = True
+    if args.incremental:
+        INCREMENTAL_MODE = True
+    if args.force_upload:
+        SKIP_UNCHANGED_UPLOADS = False
+    if args.format:
+        OUTPUT_FORMAT = args.format
+    if args.refresh_catalog:
+        REFRESH_CATALOG = True
+    if args.capture_payloads:
+        CAPTURE_PAYLOADS = True
     try:
-        success = main()
+        if args.replay:
+            success = replay_run(args.replay, upload=args.replay_upload)
+        elif args.rollups:
+            init_run()
+            success = publish_rollups()
+        elif args.inventory_metrics:
+            init_run()
+            success = publish_inventory_metrics() is not None
+        elif args.daemon:
+            success = run_daemon(concurrent=args.concurrent, max_concurrent=args.max_concurrent)
+        else:
+            success = main(
+                concurrent=args.concurrent,
+                max_concurrent=args.max_concurrent,
+                due_only=args.due_only,
+                resume=args.resume
+            )
         if success:
             logger.info("Pipeline Completed Successfully")
             sys.exit(0)
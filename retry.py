@@ -0,0 +1,187 @@
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean "try again later". For calls that are not safe to repeat (starting a report
+# task), only statuses where the server certainly did not act on the request are retried.
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+RETRYABLE_STATUSES_UNSAFE = {425, 429, 503}
+
+
+def retry_after_seconds(response):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable_status(status_code, idempotent=True):
+    return status_code in (RETRYABLE_STATUSES if idempotent else RETRYABLE_STATUSES_UNSAFE)
+
+
+def is_connect_failure(error):
+    """True when a request failed while connecting, so it was never sent to the server"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, NewConnectionError)
+
+
+def is_retryable_exception(error, idempotent=True):
+    """Transient network failures are retryable; anything else (bad data, auth, bugs) is fatal.
+
+    Errors that carry an HTTP response (requests, office365 ClientRequestException) are classified
+    by status code. An unsafe call is only retried when it failed while connecting: a read timeout
+    or a dropped connection ("Connection aborted") may come after the server acted on the request.
+    """
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "status_code", None):
+        return is_retryable_status(response.status_code, idempotent)
+    if not idempotent:
+        return is_connect_failure(error)
+    return isinstance(error, (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    ))
+
+
+class RetryPolicy:
+    """Shared retry policy: exponential backoff with jitter, Retry-After, and a per-run retry budget.
+
+    `call` runs an operation and retries it while it fails with a retryable status or exception.
+    Each retry spends one unit of the run's budget; once the budget is gone, failures are returned
+    at once so a badly degraded service cannot stretch a run out indefinitely.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0, jitter=0.5, budget=50, max_retry_after=300):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.budget = budget
+        self.max_retry_after = max_retry_after
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new run: refill the budget and clear the statistics"""
+        with self._lock:
+            self.budget_left = self.budget
+            self.budget_exhausted = 0
+            self.stats = {}
+
+    def delay(self, retry, response=None):
+        """Seconds to wait before retry number `retry` (1-based)"""
+        backoff = min(self.base_delay * 2 ** (retry - 1), self.max_delay)
+        backoff *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            return min(max(backoff, retry_after), self.max_retry_after)
+        return backoff
+
+    def _spend(self):
+        with self._lock:
+            if self.budget_left <= 0:
+                self.budget_exhausted += 1
+                return False
+            self.budget_left -= 1
+            return True
+
+    def _record(self, operation, retried, wasted_seconds, gave_up=False):
+        with self._lock:
+            stats = self.stats.setdefault(operation, {"retries": 0, "gave_up": 0, "wasted_seconds": 0.0})
+            stats["retries"] += retried
+            stats["gave_up"] += int(gave_up)
+            stats["wasted_seconds"] += wasted_seconds
+
+    def call(self, operation, func, idempotent=True, on_retry=None):
+        """Run func() with retries. func either returns a requests-style response or raises.
+
+        A final retryable response is returned as is and a final exception is re-raised, so callers
+        keep their existing error handling. on_retry() runs before each retry (e.g. to reset state).
+        """
+        retry = 0
+        wasted = 0.0
+        while True:
+            started = time.monotonic()
+            response, error = None, None
+            try:
+                response = func()
+                status_code = getattr(response, "status_code", None)
+                retryable = status_code is not None and is_retryable_status(status_code, idempotent)
+            except Exception as e:
+                error = e
+                retryable = is_retryable_exception(e, idempotent)
+            if not retryable:
+                if retry or wasted:
+                    self._record(operation, retry, wasted)
+                if error is not None:
+                    raise error
+                return response
+
+            wasted += time.monotonic() - started
+            reason = f"HTTP {response.status_code}" if error is None else f"{type(error).__name__}: {error}"
+            if retry + 1 >= self.max_attempts or not self._spend():
+                exhausted = retry + 1 < self.max_attempts
+                logger.error(
+                    f"{operation} failed ({reason}), giving up after {retry + 1} attempts"
+                    f"{' - retry budget exhausted' if exhausted else ''}"
+                )
+                self._record(operation, retry, wasted, gave_up=True)
+                if error is not None:
+                    raise error
+                return response
+
+            retry += 1
+            delay = self.delay(retry, response if error is None else getattr(error, "response", None))
+            logger.warning(f"{operation} failed ({reason}), retry {retry}/{self.max_attempts - 1} in {delay:.1f}s")
+            if response is not None:
+                response.close()
+            if on_retry is not None:
+                on_retry()
+            time.sleep(delay)
+            wasted += delay
+
+    def summary(self):
+        with self._lock:
+            return {
+                "retries": sum(s["retries"] for s in self.stats.values()),
+                "gave_up": sum(s["gave_up"] for s in self.stats.values()),
+                "wasted_seconds": sum(s["wasted_seconds"] for s in self.stats.values()),
+                "budget_left": self.budget_left,
+                "budget_exhausted": self.budget_exhausted,
+                "operations": {name: dict(stats) for name, stats in self.stats.items()},
+            }
+
+    def log_summary(self):
+        summary = self.summary()
+        logger.info(
+            f"Retries: {summary['retries']} (gave up {summary['gave_up']} times), "
+            f"{summary['wasted_seconds']:.1f}s spent on failed attempts and backoff, "
+            f"budget left {summary['budget_left']}/{self.budget}"
+        )
+        for name, stats in sorted(summary["operations"].items()):
+            logger.info(f"  {name}: {stats['retries']} retries, {stats['gave_up']} gave up, {stats['wasted_seconds']:.1f}s")
+        return summary
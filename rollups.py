@@ -0,0 +1,295 @@
+import os
+import re
+import json
+import hashlib
+import shutil
+import logging
+import threading
+from report_schemas import DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+OWNER_COLUMN = "Product Owner Name"
+# Rows whose product owner cannot be resolved from the local reports
+UNASSIGNED_OWNER = "_unassigned"
+
+# Fact reports rolled up per owner and day: report name -> date column
+ROLLUP_SOURCES = {
+    "Shipping Report": "Ship Date",
+    "exceptions": "Exception Recorded Date/Time",
+    "pickslip_activity": "Activity Start Time",
+}
+# Reports used only to resolve owners: Product ID -> owner, and Pick Slip ID -> Product ID
+OWNER_SOURCES = ["unit-details", "expectedd-all"]
+PICK_SLIP_SOURCES = ["exceptions", "returns-products"]
+
+
+def partition_name(value):
+    """Folder-safe form of an owner name (SharePoint rejects characters like # % : and slashes)"""
+    return re.sub(r"[^\w\-. ]", "_", str(value)).strip(" .") or UNASSIGNED_OWNER
+
+
+def partition_names(owners):
+    """Owner -> folder name. Owners whose folder-safe names collide (SharePoint and Windows folder names
+    ignore case) each get a suffix from a hash of the full name, so no owner overwrites another's partitions"""
+    groups = {}
+    for owner in set(owners):
+        groups.setdefault(partition_name(owner).lower(), []).append(owner)
+    names = {}
+    for group in groups.values():
+        for owner in group:
+            name = partition_name(owner)
+            if len(group) > 1:
+                name = f"{name}_{hashlib.sha1(str(owner).encode('utf-8')).hexdigest()[:8]}"
+                logger.warning(f"Rollups: owner {owner!r} shares a folder name with {len(group) - 1} other owners, using {name}")
+            names[owner] = name
+    return names
+
+
+def product_owner_map(frames):
+    """Product ID -> owner from any frames carrying both columns; the first frame wins on conflicts"""
+    import pandas as pd
+
+    pairs = [
+        df[["Product ID", OWNER_COLUMN]]
+        for df in frames
+        if df is not None and {"Product ID", OWNER_COLUMN} <= set(df.columns)
+    ]
+    if not pairs:
+        return pd.Series(dtype="object")
+    pairs = pd.concat(pairs, ignore_index=True)
+    pairs = pairs[(pairs["Product ID"] != "") & (pairs[OWNER_COLUMN] != "")]
+    return pairs.drop_duplicates("Product ID").set_index("Product ID")[OWNER_COLUMN]
+
+
+def pick_slip_owner_map(frames, product_owners):
+    """Pick Slip ID -> owner through the products that frames list on each pick slip"""
+    import pandas as pd
+
+    pairs = [
+        df[["Pick Slip ID", "Product ID"]]
+        for df in frames
+        if df is not None and {"Pick Slip ID", "Product ID"} <= set(df.columns)
+    ]
+    if not pairs:
+        return pd.Series(dtype="object")
+    pairs = pd.concat(pairs, ignore_index=True)
+    pairs["owner"] = pairs["Product ID"].map(product_owners)
+    pairs = pairs.dropna(subset=["owner"])
+    return pairs.drop_duplicates("Pick Slip ID").set_index("Pick Slip ID")["owner"]
+
+
+def resolve_owner(df, product_owners, pick_slip_owners):
+    """Owner of each row: its own owner column, else through Product ID, else through Pick Slip ID"""
+    import pandas as pd
+
+    if OWNER_COLUMN in df.columns:
+        owner = df[OWNER_COLUMN].astype("object").where(df[OWNER_COLUMN] != "")
+    else:
+        owner = pd.Series(None, index=df.index, dtype="object")
+    if "Product ID" in df.columns:
+        owner = owner.combine_first(df["Product ID"].map(product_owners).astype("object"))
+    if "Pick Slip ID" in df.columns:
+        owner = owner.combine_first(df["Pick Slip ID"].map(pick_slip_owners).astype("object"))
+    return owner.where(owner.notna(), UNASSIGNED_OWNER).astype(str)
+
+
+def prepare_source(df, date_column, product_owners, pick_slip_owners):
+    """Add Owner and Date (YYYY-MM-DD) columns, dropping rows without a parseable date"""
+    import pandas as pd
+
+    dates = pd.to_datetime(df[date_column], format=DATE_FORMAT, errors="coerce")
+    undated = int(dates.isna().sum())
+    if undated:
+        logger.warning(f"Rollups: {undated} rows without a valid {date_column} are left out")
+    df = df.assign(Owner=resolve_owner(df, product_owners, pick_slip_owners), Date=dates.dt.strftime("%Y-%m-%d"))
+    return df[dates.notna()]
+
+
+def unassigned_share(sources):
+    """(unassigned rows, total rows) over the prepared sources"""
+    frames = [df for df in sources.values() if df is not None]
+    return sum(int((df["Owner"] == UNASSIGNED_OWNER).sum()) for df in frames), sum(len(df) for df in frames)
+
+
+def partition_signatures(df):
+    """Order-independent signature of each (Owner, Date) partition's rows: row count and the sum of row hashes"""
+    import pandas as pd
+
+    if df.empty:
+        return {}
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    grouped = row_hashes.groupby([df["Owner"], df["Date"]])
+    counts = grouped.size()
+    sums = grouped.sum()
+    return {key: f"{counts[key]}:{int(sums[key]):016x}" for key in counts.index}
+
+
+def _numeric(series):
+    import pandas as pd
+
+    return pd.to_numeric(series, errors="coerce").fillna(0)
+
+
+def shipping_daily(df):
+    """Packages, voids, published freight, orders and pick slips per owner and day"""
+    void = _numeric(df["Void Flag"]) == 1
+    shipped = df.assign(
+        Shipped=~void,
+        Voided=void,
+        Freight=_numeric(df["Published Freight"]).where(~void, 0),
+    )
+    table = (
+        shipped.groupby(["Owner", "Date"])
+        .agg(
+            Packages=("Shipped", "sum"),
+            Voided_Packages=("Voided", "sum"),
+            Published_Freight=("Freight", "sum"),
+            Orders=("Order ID", "nunique"),
+            Pick_Slips=("Pick Slip ID", "nunique"),
+        )
+        .reset_index()
+    )
+    total = table["Packages"] + table["Voided_Packages"]
+    table["Void_Rate"] = (table["Voided_Packages"] / total.where(total > 0)).round(4)
+    table["Published_Freight"] = table["Published_Freight"].round(2)
+    return table.rename(columns=lambda column: column.replace("_", " "))
+
+
+def carrier_mix(df):
+    """Shipped packages and published freight per owner, day, carrier and service, with each one's share of the day"""
+    shipped = df[_numeric(df["Void Flag"]) != 1]
+    shipped = shipped.assign(Freight=_numeric(shipped["Published Freight"]))
+    table = (
+        shipped.groupby(["Owner", "Date", "Freight Carrier", "Freight Service"])
+        .agg(Packages=("Pick Slip ID", "size"), Published_Freight=("Freight", "sum"))
+        .reset_index()
+    )
+    day_total = table.groupby(["Owner", "Date"])["Packages"].transform("sum")
+    table["Package_Share"] = (table["Packages"] / day_total).round(4)
+    table["Published_Freight"] = table["Published_Freight"].round(2)
+    return table.rename(columns=lambda column: column.replace("_", " "))
+
+
+def exceptions_daily(df):
+    """Pick exceptions per owner, day and exception type, and how many are still open"""
+    table = (
+        df.assign(Open=df["Exception Status"].str.lower() != "closed")
+        .groupby(["Owner", "Date", "Exception Type"])
+        .agg(Exceptions=("Pick Slip ID", "size"), Open_Exceptions=("Open", "sum"))
+        .reset_index()
+    )
+    return table.rename(columns=lambda column: column.replace("_", " "))
+
+
+def pick_activity_daily(df):
+    """Picking activities and the orders, lines, pieces and exceptions they recorded per owner and day"""
+    columns = ["Orders Picked", "Lines Picked", "Pieces Picked", "Exceptions Recorded", "Activity Elapsed Minutes"]
+    numbers = df[["Owner", "Date"]].assign(**{column: _numeric(df[column]) for column in columns}, Activities=1)
+    return numbers.groupby(["Owner", "Date"])[["Activities"] + columns].sum().reset_index()
+
+
+# Rollup table -> (source report, function)
+ROLLUP_TABLES = {
+    "shipping_daily": ("Shipping Report", shipping_daily),
+    "carrier_mix": ("Shipping Report", carrier_mix),
+    "exceptions_daily": ("exceptions", exceptions_daily),
+    "pick_activity_daily": ("pickslip_activity", pick_activity_daily),
+}
+
+
+class RollupStore:
+    """Daily rollups kept as owner=<owner>/date=<YYYY-MM-DD>/<table>.csv partitions under root.
+
+    Each partition's input rows are summarised by a signature per source report, kept in a JSON
+    file. update() rebuilds only the partitions whose signatures changed and returns them; commit()
+    records the new signatures once they have been delivered, so a failed upload is retried next run.
+    """
+
+    def __init__(self, root, state_path):
+        self.root = root
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._signatures = {}
+        self._pending = None
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, encoding="utf-8") as state_file:
+                    self._signatures = json.load(state_file)
+            except Exception as e:
+                logger.warning(f"Could not read rollup state {state_path}: {e}")
+
+    def partition_folder(self, key):
+        owner, date = key.split("/")
+        return os.path.join(self.root, f"owner={owner}", f"date={date}")
+
+    def update(self, sources):
+        """Rebuild the partitions whose input rows changed.
+
+        sources maps report name -> DataFrame prepared with prepare_source (or None if unavailable;
+        its partitions are then left as they are). Partition keys are "<owner>/<YYYY-MM-DD>" with the
+        owner's folder name from partition_names. Returns (changed partition keys, removed partition keys).
+        """
+        import pandas as pd
+
+        folder_names = partition_names(owner for df in sources.values() if df is not None for owner in df["Owner"].unique())
+        current = {}
+        for report_name, df in sources.items():
+            if df is None:
+                # A source that could not be read keeps its previous signatures
+                for key, previous in self._signatures.items():
+                    if report_name in previous:
+                        current.setdefault(key, {})[report_name] = previous[report_name]
+                continue
+            for (owner, date), signature in partition_signatures(df).items():
+                current.setdefault(f"{folder_names[owner]}/{date}", {})[report_name] = signature
+
+        changed = sorted(key for key, signature in current.items() if self._signatures.get(key) != signature)
+        removed = sorted(set(self._signatures) - set(current))
+
+        if changed:
+            changed_index = pd.MultiIndex.from_tuples([tuple(key.split("/")) for key in changed], names=["Owner", "Date"])
+            for table_name, (report_name, rollup) in ROLLUP_TABLES.items():
+                df = sources.get(report_name)
+                if df is None:
+                    continue
+                keys = pd.MultiIndex.from_arrays([df["Owner"].map(folder_names), df["Date"]])
+                rows = df[keys.isin(changed_index)]
+                written = set()
+                if len(rows):
+                    for (owner, date), part in rollup(rows).groupby(["Owner", "Date"]):
+                        key = f"{folder_names[owner]}/{date}"
+                        os.makedirs(self.partition_folder(key), exist_ok=True)
+                        part.to_csv(os.path.join(self.partition_folder(key), f"{table_name}.csv"), index=False)
+                        written.add(key)
+                # A changed partition with no rows left for this table loses its old file
+                for key in set(changed) - written:
+                    stale = os.path.join(self.partition_folder(key), f"{table_name}.csv")
+                    if os.path.exists(stale):
+                        os.remove(stale)
+
+        for key in removed:
+            shutil.rmtree(self.partition_folder(key), ignore_errors=True)
+
+        self._pending = current
+        logger.info(f"Rollups: {len(current)} partitions, {len(changed)} rebuilt, {len(removed)} removed")
+        return changed, removed
+
+    def partition_files(self, key):
+        """(table name, local path) of the files in one partition"""
+        folder = self.partition_folder(key)
+        if not os.path.isdir(folder):
+            return []
+        return [(os.path.splitext(name)[0], os.path.join(folder, name)) for name in sorted(os.listdir(folder))]
+
+    def commit(self):
+        """Record the signatures from the last update() as delivered"""
+        with self._lock:
+            if self._pending is None:
+                return
+            self._signatures, self._pending = self._pending, None
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as state_file:
+                json.dump(self._signatures, state_file, indent=2, sort_keys=True)
+            os.replace(temp_path, self.state_path)
@@ -0,0 +1,85 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class RunStatus:
+    """Health/status file for the pipeline: current state, in-flight reports, last run and next run.
+
+    Rewritten atomically on every change, so it can be read at any time by a monitor or by hand.
+    """
+
+    def __init__(self, path, mode="once"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.status = {
+            "pid": os.getpid(),
+            "mode": mode,
+            "started_at": _now(),
+            "state": "starting",
+            "updated_at": _now(),
+            "in_flight": {},
+            "current_run": None,
+            "last_run": None,
+            "next_run": None,
+            "runs_completed": 0,
+        }
+        self._write()
+
+    def _write(self):
+        self.status["updated_at"] = _now()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as status_file:
+                json.dump(self.status, status_file, indent=2, default=str)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not write status file {self.path}: {e}")
+
+    def set_state(self, state, **fields):
+        with self._lock:
+            self.status["state"] = state
+            self.status.update(fields)
+            self._write()
+
+    def run_started(self, report_names):
+        with self._lock:
+            self.status["state"] = "running"
+            self.status["current_run"] = {"started_at": _now(), "reports": list(report_names)}
+            self._write()
+
+    def run_finished(self, results):
+        with self._lock:
+            run = self.status["current_run"] or {}
+            run["finished_at"] = _now()
+            run["results"] = {name: "OK" if success else "FAILED" for name, success in results.items()}
+            self.status["last_run"] = run
+            self.status["current_run"] = None
+            self.status["in_flight"] = {}
+            self.status["runs_completed"] += 1
+            self.status["state"] = "idle"
+            self._write()
+
+    def report_update(self, report_name, stage, task_id=None):
+        """Record that a report entered a stage such as "submitted", "processing" or "downloading\""""
+        with self._lock:
+            entry = self.status["in_flight"].setdefault(report_name, {"since": _now()})
+            entry["stage"] = stage
+            entry["stage_since"] = _now()
+            if task_id:
+                entry["task_id"] = task_id
+            self._write()
+
+    def report_finished(self, report_name, success):
+        with self._lock:
+            self.status["in_flight"].pop(report_name, None)
+            self._write()
@@ -0,0 +1,71 @@
+import re
+import time
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Files uploaded by reports.py are named <output name>_<YYYYmmdd_HHMMSS>.<csv|parquet>
+UPLOADED_FILE_PATTERN = re.compile(r"^(?P<report>.+)_(?P<stamp>\d{8}_\d{6})\.(?P<ext>csv|parquet)$", re.IGNORECASE)
+UPLOAD_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# The only file properties the archive needs from the folder listing
+LIST_FIELDS = ["Name"]
+
+
+def plan_archive(file_names, keep_last, reports=None):
+    """Pick the uploaded files to move out of the live folder.
+
+    Files are grouped per report and format. The newest `keep_last` of each group stay, and older
+    ones go to an archive subfolder named after their own upload date (YYYY-MM-DD). Files that do
+    not look like report uploads are never moved. `reports` limits the plan to those output names
+    (without extension). Returns a sorted list of (file name, subfolder) pairs.
+    """
+    groups = {}
+    for name in file_names:
+        match = UPLOADED_FILE_PATTERN.match(name)
+        if not match or (reports is not None and match["report"] not in reports):
+            continue
+        uploaded_at = datetime.strptime(match["stamp"], UPLOAD_TIMESTAMP_FORMAT)
+        groups.setdefault((match["report"], match["ext"].lower()), []).append((uploaded_at, name))
+
+    moves = []
+    for uploads in groups.values():
+        uploads.sort(reverse=True)
+        for uploaded_at, name in uploads[max(keep_last, 0):]:
+            moves.append((name, uploaded_at.strftime("%Y-%m-%d")))
+    return sorted(moves)
+
+
+def archive_uploads(uploader, archive_folder="Archive", keep_last=1, reports=None, batch_size=100):
+    """Move older report uploads in the uploader's folder into dated archive subfolders.
+
+    One listing query, one batch to create the subfolders, then one batch request per `batch_size`
+    moves, each checked by listing its folders. Files that failed to move are left in place and
+    picked up again by the next run. Returns a summary dict.
+    """
+    started = time.perf_counter()
+    folder_url = uploader.folder_url.rstrip("/")
+    archive_url = f"{folder_url}/{archive_folder}"
+
+    files = uploader.list_files(LIST_FIELDS)
+    moves = plan_archive([f["Name"] for f in files], keep_last, reports)
+    summary = {"listed": len(files), "to_move": len(moves), "moved": 0, "failed": 0, "batches": 0}
+    logger.info(f"ARCHIVE: {len(files)} files in {folder_url}, {len(moves)} to archive (keeping the newest {keep_last} per report)")
+
+    if moves:
+        subfolders = sorted({subfolder for _, subfolder in moves})
+        uploader.ensure_folders([archive_url] + [f"{archive_url}/{subfolder}" for subfolder in subfolders])
+        for i in range(0, len(moves), batch_size):
+            batch = moves[i:i + batch_size]
+            summary["batches"] += 1
+            failed = uploader.move_files([
+                (f"{folder_url}/{name}", f"{archive_url}/{subfolder}/{name}") for name, subfolder in batch
+            ])
+            summary["moved"] += len(batch) - len(failed)
+            summary["failed"] += len(failed)
+
+    summary["seconds"] = time.perf_counter() - started
+    failed = f", {summary['failed']} failed" if summary["failed"] else ""
+    logger.info(f"ARCHIVE: moved {summary['moved']} files in {summary['batches']} batches{failed} ({summary['seconds']:.2f}s)")
+    return summary
@@ -0,0 +1,331 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are uploaded through a chunked upload session
+DEFAULT_CHUNKED_UPLOAD_THRESHOLD = 4 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 2 * 1024 * 1024
+DEFAULT_CHUNK_RETRIES = 3
+
+
+class SharePointUploader:
+    """Authenticates to SharePoint once per run and uploads files into a cached target folder"""
+
+    def __init__(self, site_url, folder_url, client_id, client_secret,
+                 chunked_upload_threshold=DEFAULT_CHUNKED_UPLOAD_THRESHOLD,
+                 chunk_size=DEFAULT_CHUNK_SIZE, chunk_retries=DEFAULT_CHUNK_RETRIES, retry_policy=None):
+        self.site_url = site_url
+        self.folder_url = folder_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.chunked_upload_threshold = chunked_upload_threshold
+        self.chunk_size = chunk_size
+        self.chunk_retries = chunk_retries
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=chunk_retries)
+
+        self._ctx = None
+        self._target_folder = None
+        # ClientContext is not thread safe, so all SharePoint calls go through this lock
+        self._lock = threading.RLock()
+        self.upload_stats = []
+
+    @property
+    def context(self):
+        with self._lock:
+            if self._ctx is None:
+                # The office365 SDK is slow to import, so it is only loaded when SharePoint is used
+                from office365.sharepoint.client_context import ClientContext
+                from office365.runtime.auth.client_credential import ClientCredential
+
+                credentials = ClientCredential(self.client_id, self.client_secret)
+                self._ctx = ClientContext(self.site_url).with_credentials(credentials)
+                logger.info("SharePoint Client Credential authentication successful")
+            return self._ctx
+
+    @property
+    def target_folder(self):
+        """Resolve the upload folder once and reuse it for every upload in the run"""
+        with self._lock:
+            if self._target_folder is None:
+                ctx = self.context
+                folder = ctx.web.get_folder_by_server_relative_url(self.folder_url)
+                ctx.load(folder)
+                ctx.execute_query()
+                self._target_folder = folder
+                logger.info(f"SharePoint target folder resolved: {self.folder_url}")
+            return self._target_folder
+
+    def folder(self, folder_url=None):
+        """The upload folder, or another server-relative folder (which must already exist)"""
+        if folder_url is None or folder_url == self.folder_url:
+            return self.target_folder
+        return self.context.web.get_folder_by_server_relative_url(folder_url)
+
+    def upload(self, local_file_path, sharepoint_filename, folder_url=None):
+        """Upload one file into the upload folder, or into folder_url (a server-relative subfolder)"""
+        with self._lock:
+            return self._upload_one(local_file_path, sharepoint_filename, folder_url)
+
+    def _upload_one(self, local_file_path, sharepoint_filename, folder_url=None):
+        start = time.perf_counter()
+        size = os.path.getsize(local_file_path)
+        try:
+            logger.info(f"Uploading file: {sharepoint_filename}")
+            target_folder = self.folder(folder_url)
+            if size > max(self.chunked_upload_threshold, self.chunk_size):
+                self._upload_chunked(local_file_path, sharepoint_filename, size, folder_url)
+            else:
+                with open(local_file_path, "rb") as content_file:
+                    file_content = content_file.read()
+
+                def upload_file():
+                    target_folder.upload_file(sharepoint_filename, file_content)
+                    self.context.execute_query()
+
+                self._call("SharePoint upload", upload_file)
+            elapsed = time.perf_counter() - start
+            self.upload_stats.append({"file": sharepoint_filename, "bytes": size, "seconds": elapsed, "success": True})
+            logger.info(f"Successfully uploaded: {sharepoint_filename} ({size} bytes in {elapsed:.2f}s)")
+            logger.info(f"SharePoint URL: {self.site_url}{folder_url or self.folder_url}/{sharepoint_filename}")
+            return True
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            self.upload_stats.append({"file": sharepoint_filename, "bytes": size, "seconds": elapsed, "success": False})
+            logger.error(f"Error uploading to SharePoint: {e}")
+            logger.error(f"Error type: {type(e).__name__}")
+            import traceback
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            # Drop any half-built queries and re-resolve the folder on the next upload
+            if self._ctx is not None:
+                self._ctx.clear_queries()
+            self._target_folder = None
+            return False
+
+    def _call(self, operation, func, idempotent=True):
+        """Run a SharePoint operation under the retry policy, dropping half-built queries before each retry"""
+        return self.retry_policy.call(operation, func, idempotent=idempotent, on_retry=self.context.clear_queries)
+
+    def list_files(self, fields):
+        """Properties of the files directly in the target folder, fetched in one paged query selecting only `fields`"""
+        with self._lock:
+            ctx = self.context
+            files = ctx.web.get_folder_by_server_relative_url(self.folder_url).files
+
+            def load_files():
+                ctx.load(files, fields)
+                ctx.execute_query()
+
+            self._call("SharePoint list files", load_files)
+            # Iterating follows the collection's next links if the server paged the result
+            return [dict(f.properties) for f in files]
+
+    def _list_names(self, folder_url, kind="files"):
+        """Names of the files (or subfolders) directly in a folder. A folder that cannot be listed has none"""
+        ctx = self.context
+        items = getattr(ctx.web.get_folder_by_server_relative_url(folder_url), kind)
+
+        def load_names():
+            ctx.load(items, ["Name"])
+            ctx.execute_query()
+
+        try:
+            self._call(f"SharePoint list {kind}", load_names)
+        except Exception as e:
+            logger.warning(f"Could not list {kind} in {folder_url}: {e}")
+            ctx.clear_queries()
+            return set()
+        return {item.properties.get("Name") for item in items}
+
+    def ensure_folders(self, folder_urls):
+        """Create server-relative folders, parents listed first, in one batch request. Existing folders are kept.
+
+        A batch response does not report its parts' failures, so the parent folders are listed
+        afterwards. Returns the folder URLs that still do not exist.
+        """
+        with self._lock:
+            ctx = self.context
+
+            def create_folders():
+                for folder_url in folder_urls:
+                    ctx.web.folders.add(folder_url)
+                ctx.execute_batch()
+
+            try:
+                self._call("SharePoint create folders", create_folders)
+            except Exception as e:
+                logger.error(f"Error creating {len(folder_urls)} folders in SharePoint: {e}")
+                ctx.clear_queries()
+
+            children = {}
+            for folder_url in folder_urls:
+                parent, name = folder_url.rstrip("/").rsplit("/", 1)
+                children.setdefault(parent, set()).add(name)
+            missing = []
+            for parent, names in children.items():
+                existing = self._list_names(parent, "folders")
+                missing.extend(f"{parent}/{name}" for name in sorted(names - existing))
+            if missing:
+                logger.error(f"{len(missing)} of {len(folder_urls)} SharePoint folders were not created: {missing[:5]}")
+            return missing
+
+    def move_files(self, moves):
+        """Move (source URL, destination URL) pairs in one batch request, overwriting existing targets.
+
+        A move is not safe to repeat once the server may have acted on it, so only retries that the
+        server certainly rejected are made. A batch response does not report its parts' failures, so
+        the source and destination folders are listed afterwards: a move counts as done only when
+        its file has left the source and arrived at the destination. Returns the moves that failed.
+        """
+        with self._lock:
+            ctx = self.context
+
+            def move_batch():
+                for source_url, destination_url in moves:
+                    # 1 = MoveOperations.Overwrite
+                    ctx.web.get_file_by_server_relative_url(source_url).moveto(destination_url, 1)
+                ctx.execute_batch()
+
+            try:
+                self._call("SharePoint move files", move_batch, idempotent=False)
+            except Exception as e:
+                logger.error(f"Error moving {len(moves)} files in SharePoint: {e}")
+                ctx.clear_queries()
+
+            folders = {url.rsplit("/", 1)[0] for move in moves for url in move}
+            listed = {folder_url: self._list_names(folder_url) for folder_url in folders}
+
+            def moved(url, present):
+                folder_url, name = url.rsplit("/", 1)
+                return (name in listed[folder_url]) == present
+
+            failed = [(source, destination) for source, destination in moves
+                      if not (moved(source, False) and moved(destination, True))]
+            if failed:
+                logger.error(f"{len(failed)} of {len(moves)} SharePoint moves did not happen: {[source for source, _ in failed[:5]]}")
+            return failed
+
+    def _upload_chunked(self, local_file_path, sharepoint_filename, size, folder_url=None):
+        """Upload a large file through a start/continue/finish upload session, one chunk in memory at a time.
+
+        Before a failed chunk is retried, the server is asked how many bytes it has committed, so a
+        chunk whose response was lost is not sent twice and a transient error does not restart the
+        whole file. If the upload fails, the session is cancelled and the empty placeholder deleted.
+        """
+        ctx = self.context
+        upload_id = str(uuid.uuid4())
+        chunk_count = (size + self.chunk_size - 1) // self.chunk_size
+        logger.info(f"Using chunked upload for {sharepoint_filename}: {size} bytes in {chunk_count} chunks of {self.chunk_size} bytes")
+
+        # Create an empty file for the upload session to write into
+        self.folder(folder_url).upload_file(sharepoint_filename, b"")
+        ctx.execute_query()
+        target_file = ctx.web.get_file_by_server_relative_url(f"{folder_url or self.folder_url}/{sharepoint_filename}")
+
+        offset = 0
+        resync = False
+        with open(local_file_path, "rb") as content_file:
+
+            def upload_chunk():
+                nonlocal offset, resync
+                if resync:
+                    offset = self._committed_offset(target_file, upload_id, offset, size)
+                    resync = False
+                    if offset >= size:
+                        return
+                content_file.seek(offset)
+                chunk = content_file.read(self.chunk_size)
+                if offset == 0:
+                    result = target_file.start_upload(upload_id, chunk)
+                elif offset + len(chunk) < size:
+                    result = target_file.continue_upload(upload_id, offset, chunk)
+                else:
+                    result = None
+                    target_file.finish_upload(upload_id, offset, chunk)
+                ctx.execute_query()
+
+                # start/continue return the number of bytes the server has committed so far
+                if result is not None and result.value is not None:
+                    offset = int(result.value)
+                else:
+                    offset += len(chunk)
+
+            def before_retry():
+                nonlocal resync
+                ctx.clear_queries()
+                resync = True
+
+            try:
+                while offset < size:
+                    self.retry_policy.call("SharePoint upload chunk", upload_chunk, on_retry=before_retry)
+                    logger.info(f"Uploaded {offset} / {size} bytes of {sharepoint_filename}")
+            except Exception:
+                self._abandon_chunked(target_file, upload_id, sharepoint_filename)
+                raise
+
+    def _committed_offset(self, target_file, upload_id, offset, size):
+        """Bytes the server has committed to an upload session (offset is the local guess)"""
+        from office365.runtime.client_result import ClientResult
+        from office365.runtime.queries.service_operation_query import ServiceOperationQuery
+
+        ctx = self.context
+        status = ClientResult(None)
+        ctx.add_query(ServiceOperationQuery(target_file, "getUploadStatus", {"uploadID": upload_id}, None, None, status))
+        try:
+            ctx.execute_query()
+        except Exception:
+            ctx.clear_queries()
+            if offset + self.chunk_size < size:
+                raise
+            # A finishUpload whose response was lost ends the session, so check whether the file is complete
+            ctx.load(target_file, ["Length"])
+            ctx.execute_query()
+            if int(target_file.properties.get("Length", -1)) == size:
+                return size
+            raise
+        value = status.value
+        if isinstance(value, dict):
+            value = value.get("FileOffset")
+        return offset if value is None else int(value)
+
+    def _abandon_chunked(self, target_file, upload_id, sharepoint_filename):
+        """Cancel a failed upload session and delete its placeholder, so no empty file is left behind"""
+        from office365.runtime.queries.service_operation_query import ServiceOperationQuery
+
+        ctx = self.context
+        for operation, add_query in (
+            ("cancel upload session", lambda: ctx.add_query(
+                ServiceOperationQuery(target_file, "cancelUpload", {"uploadID": upload_id}, None, None, None))),
+            ("delete placeholder", target_file.delete_object),
+        ):
+            ctx.clear_queries()
+            try:
+                add_query()
+                ctx.execute_query()
+            except Exception as e:
+                logger.warning(f"Could not {operation} for {sharepoint_filename}: {e}")
+        ctx.clear_queries()
+
+    def reset_stats(self):
+        """Start a new run's upload statistics, so a resident process logs each run on its own"""
+        with self._lock:
+            self.upload_stats = []
+
+    def log_summary(self):
+        if not self.upload_stats:
+            return
+        logger.info("SharePoint upload latency:")
+        for stat in self.upload_stats:
+            result = "OK" if stat["success"] else "FAILED"
+            logger.info(f"  {stat['file']}: {stat['seconds']:.2f}s, {stat['bytes']} bytes ({result})")
+        total_seconds = sum(stat["seconds"] for stat in self.upload_stats)
+        total_bytes = sum(stat["bytes"] for stat in self.upload_stats if stat["success"])
+        throughput = total_bytes / total_seconds / 1024 if total_seconds else 0
+        logger.info(
+            f"  Total: {len(self.upload_stats)} files, {total_bytes} bytes in {total_seconds:.2f}s "
+            f"(avg {total_seconds / len(self.upload_stats):.2f}s/file, {throughput:.1f} KB/s)"
+        )
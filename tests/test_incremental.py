@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from incremental import HighWaterMarks, IncrementalPull
+
+CONFIG = {"date_field": "Ship Date", "key": ["Pick Slip ID", "Tracking ID"]}
+HEADER = "Pick Slip ID,Tracking ID,Ship Date\n"
+
+
+class IncrementalMergeTest(unittest.TestCase):
+    def make_pull(self, dataset):
+        folder = tempfile.mkdtemp()
+        dataset_path = os.path.join(folder, "dataset.csv")
+        with open(dataset_path, "w", encoding="utf-8") as dataset_file:
+            dataset_file.write(dataset)
+        marks = HighWaterMarks(os.path.join(folder, "marks.json"))
+        marks.set("Shipping Report", datetime(2025, 1, 1))
+        return IncrementalPull("Shipping Report", CONFIG, dataset_path, marks), os.path.join(folder, "report.csv")
+
+    def write_delta(self, path, rows):
+        with open(path, "w", encoding="utf-8") as delta_file:
+            delta_file.write(HEADER + rows)
+
+    def test_empty_existing_dataset_is_no_prior_data(self):
+        pull, output_path = self.make_pull("")
+        self.assertTrue(pull.is_delta)
+        self.write_delta(output_path, "P1,T1,01/02/2025 10:00:00\n")
+
+        self.assertEqual(pull.merge(output_path), 1)
+        self.assertEqual(pd.read_csv(output_path, dtype=str)["Pick Slip ID"].tolist(), ["P1"])
+        self.assertEqual(pull.new_mark, datetime(2025, 1, 2, 10))
+
+    def test_delta_replaces_rows_with_the_same_key(self):
+        pull, output_path = self.make_pull(HEADER + "P1,T1,01/01/2025 09:00:00\nP2,T2,01/01/2025 09:30:00\n")
+        self.write_delta(output_path, "P1,T1,01/02/2025 10:00:00\n")
+
+        self.assertEqual(pull.merge(output_path), 2)
+        merged = pd.read_csv(output_path, dtype=str)
+        self.assertEqual(merged.set_index("Pick Slip ID")["Ship Date"]["P1"], "01/02/2025 10:00:00")
+
+
+if __name__ == "__main__":
+    unittest.main()
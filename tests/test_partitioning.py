@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from partitioning import combine_partitions, count_undated_rows
+
+
+class CombinePartitionsTest(unittest.TestCase):
+    def test_keeps_rows_that_repeat_a_key_or_a_whole_row(self):
+        folder = tempfile.mkdtemp()
+        parts = [os.path.join(folder, f"report.csv.part{i}") for i in range(2)]
+        with open(parts[0], "w", encoding="utf-8") as part:
+            part.write("Pick Slip ID,Tracking ID,Ship Date\nP1,T1,01/02/2025 10:00:00\nP1,T1,01/02/2025 10:00:00\n")
+        with open(parts[1], "w", encoding="utf-8") as part:
+            part.write("Pick Slip ID,Tracking ID,Ship Date\nP1,T1,03/04/2025 10:00:00\nP2,,\n")
+        output_path = os.path.join(folder, "report.csv")
+
+        self.assertEqual(combine_partitions(parts, output_path), 4)
+        self.assertEqual(len(pd.read_csv(output_path, dtype=str, keep_default_na=False)), 4)
+        self.assertEqual(count_undated_rows(output_path, "Ship Date"), 1)
+        self.assertFalse(any(os.path.exists(path) for path in parts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from polling import make_polling_strategy
+
+
+class FixedPollingTimeoutTest(unittest.TestCase):
+    def test_report_timeout_replaces_the_attempt_cap(self):
+        strategy = make_polling_strategy("fixed", interval=3, max_attempts=20, timeout=120)
+        self.assertFalse(strategy.expired(40, 119))
+        self.assertTrue(strategy.expired(40, 120))
+        self.assertEqual(strategy.deadline, 120)
+
+    def test_without_a_timeout_fixed_polling_stops_after_max_attempts(self):
+        strategy = make_polling_strategy("fixed", interval=3, max_attempts=20)
+        self.assertFalse(strategy.expired(19, 57))
+        self.assertTrue(strategy.expired(20, 60))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from report_schemas import write_parquet_from_csv
+
+SCHEMA = {"Order ID": "string", "Pieces": "int", "Weight": "float"}
+
+
+class WriteParquetFromCsvTest(unittest.TestCase):
+    def convert(self, rows, chunksize):
+        folder = tempfile.mkdtemp()
+        csv_path = os.path.join(folder, "report.csv")
+        parquet_path = os.path.join(folder, "report.parquet")
+        with open(csv_path, "w", encoding="utf-8") as csv_file:
+            csv_file.write("Order ID,Pieces,Weight\n")
+            csv_file.writelines(f"{order},{pieces},{weight}\n" for order, pieces, weight in rows)
+        row_count = write_parquet_from_csv(csv_path, parquet_path, SCHEMA, chunksize=chunksize)
+        return row_count, pq.read_table(parquet_path)
+
+    def test_decimal_in_int_column_of_first_chunk_becomes_null(self):
+        rows = [("A1", "1.5", "2.0"), ("A2", "3", "1.25"), ("A3", "4", "")]
+        row_count, table = self.convert(rows, chunksize=2)
+        self.assertEqual(row_count, 3)
+        self.assertEqual(table.schema.field("Pieces").type, pa.int64())
+        self.assertEqual(table.column("Pieces").to_pylist(), [None, 3, 4])
+
+    def test_decimal_in_int_column_of_later_chunk_becomes_null(self):
+        rows = [("A1", "1", "2.0"), ("A2", "2", "1.25"), ("A3", "7.25", "1"), ("A4", "5", "")]
+        row_count, table = self.convert(rows, chunksize=2)
+        self.assertEqual(row_count, 4)
+        self.assertEqual(table.schema.field("Pieces").type, pa.int64())
+        self.assertEqual(table.column("Pieces").to_pylist(), [1, 2, None, 5])
+        self.assertEqual(table.column("Weight").to_pylist(), [2.0, 1.25, 1.0, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
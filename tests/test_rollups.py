@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from rollups import RollupStore, resolve_owner, UNASSIGNED_OWNER
+
+
+class RollupOwnerTest(unittest.TestCase):
+    def test_resolve_owner_falls_back_through_product_and_pick_slip(self):
+        df = pd.DataFrame({"Product ID": ["P1", "P2", "P3"], "Pick Slip ID": ["S1", "S2", "S3"]})
+        owners = resolve_owner(df, pd.Series({"P1": "Acme"}), pd.Series({"S2": "Globex"}))
+        self.assertEqual(owners.tolist(), ["Acme", "Globex", UNASSIGNED_OWNER])
+
+    def test_owners_with_the_same_folder_name_keep_separate_partitions(self):
+        folder = tempfile.mkdtemp()
+        store = RollupStore(os.path.join(folder, "rollups"), os.path.join(folder, "state.json"))
+        activity = pd.DataFrame({
+            "Owner": ["Acme/West", "Acme_West", "acme_west"],
+            "Date": ["2025-01-02"] * 3,
+            "Orders Picked": ["1", "2", "3"],
+            "Lines Picked": ["1", "1", "1"],
+            "Pieces Picked": ["1", "1", "1"],
+            "Exceptions Recorded": ["0", "0", "0"],
+            "Activity Elapsed Minutes": ["5", "5", "5"],
+        })
+
+        changed, _ = store.update({"pickslip_activity": activity})
+
+        self.assertEqual(len(changed), 3)
+        orders = sorted(
+            int(pd.read_csv(path)["Orders Picked"].iloc[0])
+            for key in changed for _, path in store.partition_files(key)
+        )
+        self.assertEqual(orders, [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
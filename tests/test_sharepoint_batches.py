@@ -0,0 +1,129 @@
+import unittest
+
+from sharepoint_archive import archive_uploads
+from sharepoint_uploader import SharePointUploader
+
+FOLDER_URL = "/sites/test/Shared Documents/Reports"
+
+
+class FakeItem:
+    def __init__(self, name):
+        self.properties = {"Name": name}
+
+
+class FakeCollection(list):
+    def __init__(self, server, folder_url, kind):
+        super().__init__()
+        self.server = server
+        self.folder_url = folder_url
+        self.kind = kind
+
+
+class FakeFolder:
+    def __init__(self, server, folder_url):
+        self.files = FakeCollection(server, folder_url, "files")
+        self.folders = FakeCollection(server, folder_url, "folders")
+
+
+class FakeFile:
+    def __init__(self, server, url):
+        self.server = server
+        self.url = url
+
+    def moveto(self, destination_url, flag):
+        self.server.queries.append(("move", self.url, destination_url))
+
+
+class FakeFolders:
+    def __init__(self, server):
+        self.server = server
+
+    def add(self, folder_url):
+        self.server.queries.append(("add", folder_url))
+
+
+class FakeWeb:
+    def __init__(self, server):
+        self.server = server
+        self.folders = FakeFolders(server)
+
+    def get_folder_by_server_relative_url(self, folder_url):
+        return FakeFolder(self.server, folder_url)
+
+    def get_file_by_server_relative_url(self, url):
+        return FakeFile(self.server, url)
+
+
+class FakeSharePoint:
+    """A ClientContext stand-in over an in-memory folder tree whose batches never report a failed part"""
+
+    def __init__(self, files, failing=()):
+        self.files = {url.rsplit("/", 1)[0]: set() for url in files}
+        for url in files:
+            folder_url, name = url.rsplit("/", 1)
+            self.files[folder_url].add(name)
+        self.failing = set(failing)
+        self.queries = []
+        self.web = FakeWeb(self)
+
+    def load(self, collection, fields):
+        self.queries.append(("load", collection))
+
+    def clear_queries(self):
+        self.queries = []
+
+    def execute_query(self):
+        queries, self.queries = self.queries, []
+        for _, collection in queries:
+            if collection.kind == "files":
+                names = self.files.get(collection.folder_url, set())
+            else:
+                prefix = f"{collection.folder_url}/"
+                names = {url[len(prefix):] for url in self.files if url.startswith(prefix) and "/" not in url[len(prefix):]}
+            collection[:] = [FakeItem(name) for name in sorted(names)]
+
+    def execute_batch(self):
+        queries, self.queries = self.queries, []
+        for query in queries:
+            if query[1] in self.failing:
+                continue
+            if query[0] == "add":
+                self.files.setdefault(query[1], set())
+            else:
+                _, source_url, destination_url = query
+                source_folder, name = source_url.rsplit("/", 1)
+                destination_folder = destination_url.rsplit("/", 1)[0]
+                if destination_folder in self.files:
+                    self.files[source_folder].discard(name)
+                    self.files[destination_folder].add(name)
+
+
+def uploader_for(server):
+    uploader = SharePointUploader("https://example.sharepoint.com", FOLDER_URL, "id", "secret")
+    uploader._ctx = server
+    return uploader
+
+
+class BatchPartFailureTest(unittest.TestCase):
+    def test_archive_counts_a_move_that_failed_inside_the_batch(self):
+        names = ["orders_20250101_080000.csv", "orders_20250102_080000.csv", "orders_20250103_080000.csv"]
+        server = FakeSharePoint([f"{FOLDER_URL}/{name}" for name in names], failing={f"{FOLDER_URL}/{names[1]}"})
+
+        summary = archive_uploads(uploader_for(server), keep_last=1)
+
+        self.assertEqual(summary["moved"], 1)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(server.files[FOLDER_URL], {names[1], names[2]})
+        self.assertEqual(server.files[f"{FOLDER_URL}/Archive/2025-01-01"], {names[0]})
+
+    def test_ensure_folders_returns_the_folders_a_batch_did_not_create(self):
+        server = FakeSharePoint([f"{FOLDER_URL}/orders_20250101_080000.csv"], failing={f"{FOLDER_URL}/Archive/2025-01-02"})
+        folder_urls = [f"{FOLDER_URL}/Archive", f"{FOLDER_URL}/Archive/2025-01-01", f"{FOLDER_URL}/Archive/2025-01-02"]
+
+        missing = uploader_for(server).ensure_folders(folder_urls)
+
+        self.assertEqual(missing, [f"{FOLDER_URL}/Archive/2025-01-02"])
+
+
+if __name__ == "__main__":
+    unittest.main()
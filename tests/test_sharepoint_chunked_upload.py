@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from urllib.parse import unquote
+
+import requests
+from office365.sharepoint.client_context import ClientContext
+
+from retry import RetryPolicy
+from sharepoint_uploader import SharePointUploader
+
+SITE_URL = "https://example.sharepoint.com/sites/test"
+FOLDER_URL = "/sites/test/Shared Documents/Reports"
+FILE_API = f"{SITE_URL}/_api/Web/getFileByServerRelativeUrl('{FOLDER_URL}/big.csv')"
+
+
+class NoAuth:
+    def authenticate_request(self, request):
+        pass
+
+
+def json_response(body, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode("utf-8")
+    response.headers["Content-Type"] = "application/json;odata=verbose"
+    return response
+
+
+class FakeUploadSession:
+    """The SharePoint REST endpoints of a chunked upload, recording every request.
+
+    lose_response_at commits the chunk sent at that offset but drops the response, as a connection
+    reset after the server acted would. fail_from makes every chunk at or after that offset fail.
+    """
+
+    def __init__(self, lose_response_at=None, fail_from=None):
+        self.lose_response_at = lose_response_at
+        self.fail_from = fail_from
+        self.committed = b""
+        self.requests = []
+
+    def post(self, url, headers=None, data=None, json=None, **kwargs):
+        url = unquote(url)
+        self.requests.append({"method": (headers or {}).get("X-HTTP-Method", "POST"), "url": url, "body": data})
+        if url.endswith("/contextInfo"):
+            return json_response({"d": {"GetContextWebInformation": {"FormDigestValue": "digest", "FormDigestTimeoutSeconds": 1800}}})
+        for method in ("startUpload", "continueUpload", "finishUpload"):
+            if f"/{method}(" in url:
+                offset = 0 if method == "startUpload" else int(url.rsplit("fileOffset=", 1)[1].rstrip(")"))
+                if self.fail_from is not None and offset >= self.fail_from:
+                    raise requests.exceptions.ConnectionError("connection reset")
+                if offset != len(self.committed):
+                    return json_response({"error": {"message": {"value": "offset mismatch"}}}, 400)
+                self.committed += data
+                if offset == self.lose_response_at:
+                    self.lose_response_at = None
+                    raise requests.exceptions.ConnectionError("connection reset")
+                return json_response({"d": {method[0].upper() + method[1:]: str(len(self.committed))}})
+        if "/getUploadStatus(" in url:
+            return json_response({"d": {"GetUploadStatus": {"FileOffset": len(self.committed)}}})
+        return json_response({"d": {}})
+
+    def calls(self, name):
+        return [request for request in self.requests if f"/{name}(" in request["url"]]
+
+
+class ChunkedUploadTest(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.content = bytes(range(45))
+        self.local_path = os.path.join(folder, "big.csv")
+        with open(self.local_path, "wb") as local_file:
+            local_file.write(self.content)
+
+    def upload(self, session):
+        uploader = SharePointUploader(SITE_URL, FOLDER_URL, "id", "secret", chunked_upload_threshold=10, chunk_size=10,
+                                      retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+        uploader._ctx = ClientContext(SITE_URL, NoAuth())
+        uploader._target_folder = uploader._ctx.web.get_folder_by_server_relative_url(FOLDER_URL)
+        # Both cases retry a chunk, which logs warnings
+        with mock.patch("requests.post", session.post), self.assertLogs(level="WARNING"):
+            return uploader.upload(self.local_path, "big.csv")
+
+    def test_lost_chunk_response_resumes_from_the_server_offset(self):
+        session = FakeUploadSession(lose_response_at=10)
+
+        self.assertTrue(self.upload(session))
+
+        self.assertEqual(session.committed, self.content)
+        status = session.calls("getUploadStatus")
+        self.assertEqual(len(status), 1)
+        self.assertEqual(status[0]["method"], "POST")
+        self.assertTrue(status[0]["url"].startswith(FILE_API))
+        self.assertIn("/getUploadStatus(uploadID='", status[0]["url"])
+        self.assertIsNone(status[0]["body"])
+        # The chunk at offset 10 is not sent again; the upload carries on from the server's 20 bytes
+        offsets = [request["url"].rsplit("fileOffset=", 1)[1].rstrip(")") for request in session.calls("continueUpload")]
+        self.assertEqual(offsets, ["10", "20", "30"])
+        self.assertEqual(len(session.calls("finishUpload")), 1)
+        self.assertEqual(session.calls("cancelUpload"), [])
+
+    def test_failed_upload_cancels_the_session_and_deletes_the_placeholder(self):
+        session = FakeUploadSession(fail_from=20)
+
+        self.assertFalse(self.upload(session))
+
+        cancel = session.calls("cancelUpload")
+        self.assertEqual(len(cancel), 1)
+        self.assertEqual(cancel[0]["method"], "POST")
+        self.assertTrue(cancel[0]["url"].startswith(FILE_API))
+        upload_id = session.calls("startUpload")[0]["url"].split("uploadID='", 1)[1].split("'", 1)[0]
+        self.assertTrue(cancel[0]["url"].endswith(f"/cancelUpload(uploadID='{upload_id}')"))
+        self.assertIsNone(cancel[0]["body"])
+        delete = [request for request in session.requests if request["method"] == "DELETE"]
+        self.assertEqual([request["url"] for request in delete], [FILE_API])
+        self.assertLess(session.requests.index(cancel[0]), session.requests.index(delete[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import base64
+import logging
+import threading
+from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+VERACORE_BASE_URL = os.getenv("VERACORE_BASE_URL", "https://wms.3plwinner.com/VeraCore/Public.Api/api")
+# Pipeline state (token cache, timings, checkpoints) lives here. Every entry point uses this one
+# folder, relative to the working directory the launcher runs from
+STATE_FOLDER = os.path.join(os.getcwd(), "state")
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(STATE_FOLDER, "veracore_token.json")
+
+# Used when neither the login response nor the token itself says when it expires
+DEFAULT_TOKEN_LIFETIME = timedelta(hours=float(os.getenv("VERACORE_TOKEN_LIFETIME_HOURS", "12")))
+
+# Timeouts in seconds for each kind of VeraCore call
+DEFAULT_TIMEOUTS = {
+    "login": 120,
+    "catalog": 60,
+    "start": 30,
+    "status": 90,
+    "data": 90,
+}
+
+
+class VeraCoreClient:
+    """Shared keep-alive HTTP session for all VeraCore Public API calls"""
+
+    def __init__(self, base_url=VERACORE_BASE_URL, pool_size=10, timeouts=None, retry_policy=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self.retry_policy = retry_policy
+        self.auth_header = None
+        self.token_manager = None
+        self.requests_sent = 0
+        self.relogins = 0
+        self._lock = threading.Lock()
+
+    def set_auth_header(self, auth_header):
+        """Attach the bearer token header to every request sent through the session"""
+        self.auth_header = auth_header
+        self.session.headers.update(auth_header)
+
+    def url(self, path):
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, endpoint="data", **kwargs):
+        """Send a request through the pooled session using the timeout configured for the endpoint.
+
+        With a token manager attached, the token is refreshed shortly before it expires, and a 401
+        triggers one fresh login and a single retry of the request. With a retry policy, transient
+        failures (5xx, 429, timeouts, dropped connections) are retried with backoff.
+        """
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint))
+        managed = self.token_manager is not None and endpoint != "login"
+        if managed:
+            self.token_manager.ensure_fresh()
+        sent_header = self.auth_header
+        response = self._send(method, path, endpoint, **kwargs)
+        if managed and response.status_code == 401:
+            logger.warning(f"VeraCore returned 401 for {path}, logging in again and retrying once")
+            response.close()
+            self.token_manager.refresh(stale_header=sent_header)
+            with self._lock:
+                self.relogins += 1
+            response = self._send(method, path, endpoint, **kwargs)
+        return response
+
+    def _send(self, method, path, endpoint, **kwargs):
+        def send():
+            with self._lock:
+                self.requests_sent += 1
+            return self.session.request(method, self.url(path), **kwargs)
+
+        if self.retry_policy is None:
+            return send()
+        # Starting a report task is the one call that must not be repeated if it may have gone through
+        idempotent = method == "GET" or endpoint == "login"
+        return self.retry_policy.call(f"VeraCore {endpoint}", send, idempotent=idempotent)
+
+    def get(self, path, endpoint="data", **kwargs):
+        return self.request("GET", path, endpoint, **kwargs)
+
+    def post(self, path, endpoint="data", **kwargs):
+        return self.request("POST", path, endpoint, **kwargs)
+
+    def connections_opened(self):
+        """Number of TCP connections opened by the pool so far"""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def connection_stats(self):
+        return {
+            "requests_sent": self.requests_sent,
+            "connections_opened": self.connections_opened(),
+        }
+
+    def log_connection_stats(self):
+        stats = self.connection_stats()
+        logger.info(f"VeraCore connections opened: {stats['connections_opened']} / requests sent: {stats['requests_sent']}")
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+def _jwt_expiry(token):
+    """Expiry from the token's own `exp` claim, if it is a JWT"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return datetime.fromtimestamp(claims["exp"])
+    except Exception:
+        return None
+
+
+def _login_expiry(response_data):
+    """Expiry from the login response, if it includes one"""
+    for key in ("ExpiresIn", "expires_in"):
+        if response_data.get(key):
+            return datetime.now() + timedelta(seconds=float(response_data[key]))
+    for key in ("Expires", "ExpirationDate", "Expiration", ".expires"):
+        if response_data.get(key):
+            try:
+                return datetime.fromisoformat(str(response_data[key]).replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                pass
+    return None
+
+
+class TokenManager:
+    """Keeps a valid VeraCore token on the client.
+
+    The token and its expiry are cached in a local JSON file, so a run only logs in when the cached
+    token is missing or about to expire; there is no test request to validate it. If the server
+    rejects it anyway, VeraCoreClient calls refresh() and retries once.
+    """
+
+    def __init__(self, client, username, password, system_id, cache_path=DEFAULT_TOKEN_CACHE_PATH,
+                 seed_token=None, refresh_margin=timedelta(minutes=5), lifetime=DEFAULT_TOKEN_LIFETIME):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.system_id = system_id
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.lifetime = lifetime
+        self.token = None
+        self.expires_at = None
+        self._lock = threading.RLock()
+        self._load_cache()
+        if self.token is None and seed_token:
+            # A token from the environment has an unknown age; trust it until it expires or is rejected
+            self.token = seed_token
+            self.expires_at = _jwt_expiry(seed_token) or datetime.now() + self.lifetime
+        client.token_manager = self
+
+    @property
+    def auth_header(self):
+        return {"Authorization": f"bearer {self.token}"}
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+            if cached.get("system_id") == self.system_id and cached.get("username") == self.username:
+                self.token = cached["token"]
+                self.expires_at = datetime.fromisoformat(cached["expires_at"])
+        except Exception as e:
+            logger.warning(f"Could not read token cache {self.cache_path}: {e}")
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({
+                "token": self.token,
+                "expires_at": self.expires_at.isoformat(timespec="seconds"),
+                "username": self.username,
+                "system_id": self.system_id,
+            }, cache_file, indent=2)
+        os.replace(temp_path, self.cache_path)
+
+    def is_fresh(self):
+        return self.token is not None and self.expires_at is not None and \
+            datetime.now() < self.expires_at - self.refresh_margin
+
+    def get_auth_header(self):
+        """Return a valid auth header, logging in only if the cached token is missing or expiring"""
+        with self._lock:
+            if self.is_fresh():
+                logger.info(f"Using cached VeraCore token (expires {self.expires_at.isoformat(timespec='seconds')})")
+            else:
+                self.login()
+            self.client.set_auth_header(self.auth_header)
+            return self.auth_header
+
+    def ensure_fresh(self):
+        if not self.is_fresh():
+            with self._lock:
+                if not self.is_fresh():
+                    logger.info("VeraCore token is about to expire, refreshing")
+                    self.login()
+                    self.client.set_auth_header(self.auth_header)
+
+    def refresh(self, stale_header=None):
+        """Log in again after a 401, unless another thread already replaced the rejected token"""
+        with self._lock:
+            if stale_header is None or stale_header == self.client.auth_header:
+                self.login()
+            self.client.set_auth_header(self.auth_header)
+
+    def login(self):
+        body = {
+            "userName": self.username,
+            "password": self.password,
+            "systemId": self.system_id
+        }
+        started = time.perf_counter()
+        response = self.client.post("Login", endpoint="login", data=body)
+        if response.status_code != 200:
+            raise RuntimeError(f"Login Failed: {response.status_code} {response.text[:500]}")
+        response_data = response.json()
+        self.token = response_data["Token"]
+        self.expires_at = _login_expiry(response_data) or _jwt_expiry(self.token) or datetime.now() + self.lifetime
+        self._save_cache()
+        logger.info(
+            f"Logged in to VeraCore in {time.perf_counter() - started:.2f}s, "
+            f"token cached until {self.expires_at.isoformat(timespec='seconds')}"
+        )